@@ -1,3 +1,3 @@
-from app.api.routes import router
+from app.api.routes import router, shutdown_executors, init_task_queue, close_task_queue, api_worker_count, init_cpu_pool
 
-__all__ = ["router"]
\ No newline at end of file
+__all__ = ["router", "shutdown_executors", "init_task_queue", "close_task_queue", "api_worker_count", "init_cpu_pool"]
\ No newline at end of file
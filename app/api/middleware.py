@@ -0,0 +1,46 @@
+# asgi middleware for request body limits
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+
+# room for the multipart boundaries and the small form fields next to the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class BodySizeLimitMiddleware:
+    # enforces the upload size limit while the body is being received.
+    # fastapi parses (and spools) multipart forms before the endpoint runs, so a check
+    # inside a route only fires after the whole body has been read
+    
+    def __init__(self, app, max_body_bytes: int, detail: str):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.detail = detail
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # Content-Length lets most oversized requests be refused without reading anything
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > self.max_body_bytes:
+                    response = ORJSONResponse({"detail": self.detail}, status_code=413)
+                    await response(scope, receive, send)
+                    return
+                break
+        
+        # chunked or lying clients are cut off as soon as the running count goes over
+        received = 0
+        
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    # fastapi re-raises HTTPExceptions from body parsing as they are
+                    raise HTTPException(status_code=413, detail=self.detail)
+            return message
+        
+        await self.app(scope, limited_receive, send)
@@ -1,16 +1,28 @@
 
+import asyncio
+import json
 import logging
+import multiprocessing
+import os
+import re
 import time
-import shutil
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
-from datetime import datetime
+from typing import Optional, Union
+import aiofiles
+import aiofiles.tempfile
+from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Request, Response
+from datetime import datetime, timezone
 
 from app.models.schemas import (
     UploadResponse,
+    UploadInitRequest,
+    UploadChunkResponse,
     ProcessRequest,
     ProcessResponse,
+    SyncSummaryResponse,
+    MultiSummaryResponse,
     StatusResponse,
     ErrorResponse,
     SummaryMode,
@@ -18,11 +30,14 @@ from app.models.schemas import (
 )
 from app.processors import (
     PDFExtractor,
-    EntityExtractor,
+    split_pages,
+    get_entity_extractor,
+    set_ner_threads,
     LLMServiceFactory,
     job_manager,
     JobState
 )
+from app.processors.cache import LRUCache, bytes_key, content_key, file_key
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -33,19 +48,245 @@ router = APIRouter()
 UPLOAD_DIR = Path("/tmp/pdf_summarizer_uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+# read uploads in 1 MiB chunks so the event loop can interleave concurrent uploads
+UPLOAD_CHUNK_SIZE = 1 << 20
 
-@router.post("/upload", response_model=UploadResponse)
-async def upload_pdf(
-    file: UploadFile = File(...),
-    max_pages: int = 3,
-    extract_tables: bool = True
-) -> UploadResponse:
-    # upload a pdf file and create a processing job
+
+def api_worker_count() -> int:
+    # uvicorn workers started by python -m app.main, in memory jobs are per process
+    # so without redis there is only ever one
+    if not settings.REDIS_URL:
+        return 1
+    return settings.API_WORKERS or os.cpu_count() or 1
+
+
+# cpu bound pdf parsing and NER run here so they dont block the event loop.
+# the pool starts lazily, often after the hf / openai threads are running, and forking a
+# process with live threads can deadlock the child on a lock another thread held
+_MP_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+_CPU_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def init_cpu_pool(cores: Optional[int] = None) -> None:
+    # called once at process startup. cores is what this process may use, by default the
+    # api splits them evenly across its workers, the arq worker runs alone and passes its own
+    global _CPU_POOL
+    cores = cores or max(1, (os.cpu_count() or 1) // api_worker_count())
+    max_workers = settings.CPU_POOL_WORKERS or cores
+    # the cores left per pool process go to the threaded NER of long texts, so a full
+    # pool runs NER single threaded instead of oversubscribing the cpu
+    ner_threads = max(1, cores // max_workers)
+    _CPU_POOL = ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context(_MP_START_METHOD),
+        initializer=set_ner_threads,
+        initargs=(ner_threads,)
+    )
+
+
+def _extract(
+    path: Path,
+    max_pages: int,
+    extract_tables: bool = False,
+    char_budget: Optional[int] = None
+) -> dict:
+    # runs inside a worker process
+    return PDFExtractor(max_pages=max_pages).extract_from_file(
+        path, extract_tables=extract_tables, char_budget=char_budget
+    )
 
 
+def _extract_bytes(
+    data: bytes,
+    max_pages: int,
+    extract_tables: bool = False,
+    char_budget: Optional[int] = None
+) -> dict:
+    # runs inside a worker process
+    return PDFExtractor(max_pages=max_pages).extract_from_bytes(
+        data, extract_tables=extract_tables, char_budget=char_budget
+    )
+
+
+def _entities(text: str, entity_types: Optional[list] = None) -> list:
+    # runs inside a worker process. multi page text goes through spacy as one batch of pages,
+    # a single long page keeps the chunked parallel path of extract_entities
+    extractor = get_entity_extractor()
+    pages = split_pages(text)
+    if len(pages) == 1:
+        return extractor.extract_entities(text, entity_types=entity_types)
+    return extractor.extract_entities_pages(pages, entity_types=entity_types)
+
+
+# extraction and entities are pure functions of the pdf / text, so re-uploads of the
+# same document skip parsing and NER entirely
+_extract_cache = LRUCache(maxsize=settings.EXTRACT_CACHE_SIZE)
+_entity_cache = LRUCache(maxsize=settings.RESULT_CACHE_SIZE)
+
+
+def _llm_input(text: str, backend: LLMBackend) -> str:
+    # each backend reads at most its char budget (openai 40k chars, about 10k tokens).
+    # only the llm input is cut, entities are still extracted from the full text
+    budget = LLMServiceFactory.char_budget(backend)
+    return text[:budget] if budget else text
+
 
+def _summarize(text: str, mode: SummaryMode, backend: LLMBackend) -> tuple[str, dict]:
+    # llm calls are mostly network bound so this runs in a thread, not the process pool.
+    # repeat texts are served from the llm services own summary cache
+    llm_service = LLMServiceFactory.create(backend)
+    summary = llm_service.summarize(_llm_input(text, backend), mode=mode)
+    return summary, llm_service.get_model_info()
+
+
+async def _run_extract(
+    source: Union[Path, bytes],
+    max_pages: int,
+    extract_tables: bool = False,
+    char_budget: Optional[int] = None
+) -> dict:
+    # keyed by the pdf bytes and looked up in the parent, same as _run_entities
+    if isinstance(source, Path):
+        digest = await asyncio.to_thread(file_key, source)
+        extract_fn = _extract
+    else:
+        digest = await asyncio.to_thread(bytes_key, source)
+        extract_fn = _extract_bytes
+    
+    key = (digest, max_pages, extract_tables, char_budget)
+    cached = _extract_cache.get(key)
+    if cached is not None:
+        # callers only read the result, a shallow copy is enough
+        return dict(cached)
+    
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(
+        _CPU_POOL, extract_fn, source, max_pages, extract_tables, char_budget
+    )
+    _extract_cache.set(key, result)
+    return dict(result)
+
+
+async def _run_entities(text: str, entity_types: Optional[list] = None) -> list:
+    # cache lookup happens here in the parent so hits dont depend on which pool worker ran it
+    key = (content_key(text), tuple(sorted(entity_types)) if entity_types else None)
+    cached = _entity_cache.get(key)
+    if cached is not None:
+        return list(cached)
+    
+    loop = asyncio.get_running_loop()
+    entities = await loop.run_in_executor(_CPU_POOL, _entities, text, entity_types)
+    _entity_cache.set(key, entities)
+    return list(entities)
+
+
+def shutdown_executors() -> None:
+    # called on app shutdown
+    if _CPU_POOL is not None:
+        _CPU_POOL.shutdown(wait=False, cancel_futures=True)
+
+
+# arq pool, only set when REDIS_URL is configured
+_task_queue = None
+
+
+async def init_task_queue() -> None:
+    # called on app startup, jobs go to the arq worker instead of background tasks
+    global _task_queue
+    if not settings.REDIS_URL:
+        return
+    from arq import create_pool
+    from arq.connections import RedisSettings
+    _task_queue = await create_pool(RedisSettings.from_dsn(settings.REDIS_URL))
+    logger.info("Connected to arq task queue")
+
+
+async def close_task_queue() -> None:
+    # called on app shutdown
+    global _task_queue
+    if _task_queue is not None:
+        await _task_queue.close()
+        _task_queue = None
+
+
+def _max_upload_bytes() -> int:
+    return settings.MAX_FILE_SIZE_MB * 1024 * 1024
+
+
+def _file_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large, max size is {settings.MAX_FILE_SIZE_MB} MB"
+    )
+
+
+async def _stream_upload(file: UploadFile, out) -> None:
+    # copy the uploaded file into an open aiofiles handle chunk by chunk,
+    # aborting as soon as it goes over the size limit
+    max_bytes = _max_upload_bytes()
+    total = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        total += len(chunk)
+        if total > max_bytes:
+            raise _file_too_large()
+        await out.write(chunk)
+
+
+def _sendfile_to_path(in_fd: int, dest: Path) -> None:
+    # in kernel copy of an already spooled upload, no user space buffering
+    size = os.fstat(in_fd).st_size
+    with dest.open("wb") as out:
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(out.fileno(), in_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+
+
+async def _save_upload(file: UploadFile, dest: Path) -> None:
+    try:
+        await _copy_upload(file, dest)
+    except BaseException:
+        # cancellation or any other error mid copy must not leave a half written file behind
+        dest.unlink(missing_ok=True)
+        raise
+
+
+async def _copy_upload(file: UploadFile, dest: Path) -> None:
+    # starlette already spooled the request body, small uploads sit in memory and
+    # bigger ones were rolled to a temp file on disk, so avoid copying through python again
+    spooled = file.file
+    await file.seek(0)
+    
+    if getattr(spooled, "_rolled", False):
+        spooled.flush()
+        if os.fstat(spooled.fileno()).st_size > _max_upload_bytes():
+            raise _file_too_large()
+        
+        if hasattr(os, "sendfile"):
+            try:
+                await asyncio.to_thread(_sendfile_to_path, spooled.fileno(), dest)
+                return
+            except OSError as e:
+                logger.warning(f"sendfile failed, falling back to chunked copy: {str(e)}")
+                await file.seek(0)
+        
+        async with aiofiles.open(dest, "wb") as out:
+            await _stream_upload(file, out)
+        return
+    
+    # still in memory, write it out in one go
+    data = spooled.read()
+    if len(data) > _max_upload_bytes():
+        raise _file_too_large()
+    async with aiofiles.open(dest, "wb") as out:
+        await out.write(data)
+
+
+def _validate_upload_params(filename: str, max_pages: int) -> None:
     # Validate file type
-    if not file.filename.endswith('.pdf'):
+    if not filename.endswith('.pdf'):
         raise HTTPException(
             status_code=400,
             detail="Only pdf files"
@@ -57,52 +298,276 @@ async def upload_pdf(
             status_code=400,
             detail="max_pages must be between 1 and 3"
         )
+
+
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def _secure_filename(filename: str) -> str:
+    # drop any path components and characters that are unsafe on disk
+    name = Path(filename).name
+    name = _UNSAFE_FILENAME_CHARS.sub("_", name).strip("._")
+    return name or "upload.pdf"
+
+
+def _upload_file_path(filename: str) -> tuple[str, Path]:
+    # Generate unique filename, a uuid prefix avoids collisions between uploads in the same second
+    safe_filename = f"{uuid.uuid4().hex}_{_secure_filename(filename)}"
+    return safe_filename, UPLOAD_DIR / safe_filename
+
+
+async def _register_upload(
+    file_path: Path,
+    filename: str,
+    safe_filename: str,
+    max_pages: int,
+    extract_tables: bool
+) -> UploadResponse:
+    # validate a fully written upload and create its job
+    file_size = file_path.stat().st_size
+    logger.info(f"Uploaded file: {safe_filename} ({file_size} bytes)")
+    
+    # Quick pdf validation, text is extracted once later by the background task
+    try:
+        pdf_extractor = PDFExtractor(max_pages=max_pages)
+        page_count = await asyncio.to_thread(pdf_extractor.get_page_count, file_path)
+    except Exception as e:
+        # Clean up file if pdf is invalid
+        file_path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid pdf: {str(e)}"
+        )
+    
+    # Create job
+    file_info = {
+        "filename": filename,
+        "safe_filename": safe_filename,
+        "file_path": str(file_path),
+        "size_bytes": file_size,
+        "pages": page_count,
+        "max_pages": max_pages,
+        "extract_tables": extract_tables,
+        "uploaded_at": datetime.now(timezone.utc).isoformat()
+    }
+    
+    job_id = await job_manager.create_job(file_info)
+    
+    return UploadResponse(
+        job_id=job_id,
+        status="pending",
+        message="pdf uploaded successfully. Use /process to start summarization.",
+        file_info=file_info
+    )
+
+
+@router.post("/upload", response_model=UploadResponse)
+async def upload_pdf(
+    file: UploadFile = File(...),
+    max_pages: int = 3,
+    extract_tables: bool = True
+) -> UploadResponse:
+    # upload a pdf file and create a processing job
+    # single request version of /upload/init + PATCH /upload/{id} + /upload/{id}/finish
+    # the body size limit itself is enforced by BodySizeLimitMiddleware while it is received
+    _validate_upload_params(file.filename, max_pages)
     
     try:
-        # Generate unique filename
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        safe_filename = f"{timestamp}_{file.filename}"
-        file_path = UPLOAD_DIR / safe_filename
+        safe_filename, file_path = _upload_file_path(file.filename)
         
-        # Save uploaded file
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Save uploaded file without blocking the event loop
+        await _save_upload(file, file_path)
         
-        file_size = file_path.stat().st_size
-        logger.info(f"Uploaded file: {safe_filename} ({file_size} bytes)")
+        return await _register_upload(
+            file_path, file.filename, safe_filename, max_pages, extract_tables
+        )
         
-        # Quick pdf validation, extract basic info
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Upload failed: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Upload failed: {str(e)}"
+        )
+
+
+# Resumable chunked uploads
+# state lives next to the partial file so any worker sharing UPLOAD_DIR can serve a chunk:
+#   {upload_id}.part   sparse file of the final size
+#   {upload_id}.json   upload metadata
+#   {upload_id}.ranges one "start end" line per received chunk
+# finish renames the .json to {upload_id}.finishing first, only one caller can win that
+
+_UPLOAD_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+_CHUNKED_UPLOAD_SUFFIXES = (".part", ".json", ".ranges", ".finishing")
+
+
+def _sweep_chunked_uploads() -> None:
+    # drop uploads that were never finished, the last write to the .json / .ranges counts
+    # as activity. runs on every /upload/init so abandoned parts cant pile up
+    cutoff = time.time() - settings.CHUNKED_UPLOAD_TTL_SECONDS
+    for state_path in [*UPLOAD_DIR.glob("*.json"), *UPLOAD_DIR.glob("*.finishing")]:
+        upload_id = state_path.stem
+        if not _UPLOAD_ID_RE.match(upload_id):
+            continue
+        ranges_path = UPLOAD_DIR / f"{upload_id}.ranges"
         try:
-            pdf_extractor = PDFExtractor(max_pages=max_pages)
-            pdf_info = pdf_extractor.extract_from_file(file_path, extract_tables=False)
-            page_count = pdf_info['page_count']
-        except Exception as e:
-            # Clean up file if pdf is invalid
-            file_path.unlink(missing_ok=True)
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid pdf: {str(e)}"
+            last_active = max(
+                state_path.stat().st_mtime,
+                ranges_path.stat().st_mtime if ranges_path.exists() else 0
             )
+        except FileNotFoundError:
+            continue  # finished or swept by another worker meanwhile
+        if last_active < cutoff:
+            for suffix in _CHUNKED_UPLOAD_SUFFIXES:
+                (UPLOAD_DIR / f"{upload_id}{suffix}").unlink(missing_ok=True)
+            logger.info(f"Expired chunked upload {upload_id}")
+
+
+def _chunked_upload_paths(upload_id: str) -> tuple[Path, Path, Path]:
+    if not _UPLOAD_ID_RE.match(upload_id):
+        raise HTTPException(status_code=404, detail=f"Upload {upload_id} not found")
+    part_path = UPLOAD_DIR / f"{upload_id}.part"
+    meta_path = UPLOAD_DIR / f"{upload_id}.json"
+    ranges_path = UPLOAD_DIR / f"{upload_id}.ranges"
+    if not meta_path.exists():
+        raise HTTPException(status_code=404, detail=f"Upload {upload_id} not found")
+    return part_path, meta_path, ranges_path
+
+
+async def _read_upload_meta(meta_path: Path) -> dict:
+    async with aiofiles.open(meta_path, "r") as f:
+        return json.loads(await f.read())
+
+
+async def _received_bytes(ranges_path: Path) -> int:
+    # length of the contiguous prefix covered by received chunks
+    if not ranges_path.exists():
+        return 0
+    async with aiofiles.open(ranges_path, "r") as f:
+        lines = (await f.read()).splitlines()
+    
+    ranges = sorted(tuple(map(int, line.split())) for line in lines if line.strip())
+    received = 0
+    for start, end in ranges:
+        if start > received:
+            break
+        received = max(received, end)
+    return received
+
+
+@router.post("/upload/init", response_model=UploadChunkResponse)
+async def init_chunked_upload(request: UploadInitRequest) -> UploadChunkResponse:
+    # start a resumable upload, the file is then sent with PATCH /upload/{upload_id}
+    _validate_upload_params(request.filename, request.max_pages)
+    if request.size_bytes > _max_upload_bytes():
+        raise _file_too_large()
+    
+    await asyncio.to_thread(_sweep_chunked_uploads)
+    
+    upload_id = uuid.uuid4().hex
+    part_path = UPLOAD_DIR / f"{upload_id}.part"
+    meta_path = UPLOAD_DIR / f"{upload_id}.json"
+    
+    # sparse file of the final size so chunks can arrive in any order
+    async with aiofiles.open(part_path, "wb") as f:
+        await f.truncate(request.size_bytes)
+    
+    async with aiofiles.open(meta_path, "w") as f:
+        await f.write(json.dumps(request.model_dump()))
+    
+    logger.info(f"Started chunked upload {upload_id} for {request.filename} ({request.size_bytes} bytes)")
+    return UploadChunkResponse(upload_id=upload_id, offset=0, size_bytes=request.size_bytes)
+
+
+def _chunk_out_of_range(offset: int, length, size_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=f"Chunk of {length} bytes at offset {offset} is outside the declared size of {size_bytes} bytes"
+    )
+
+
+@router.patch("/upload/{upload_id}", response_model=UploadChunkResponse)
+async def upload_chunk(upload_id: str, offset: int, request: Request) -> UploadChunkResponse:
+    # write one chunk (raw request body) at the given byte offset
+    part_path, meta_path, ranges_path = _chunked_upload_paths(upload_id)
+    meta = await _read_upload_meta(meta_path)
+    
+    # bytes this chunk may still hold, checked before anything is read
+    remaining = meta["size_bytes"] - offset
+    content_length = request.headers.get("content-length")
+    if offset < 0 or remaining < 0 or (
+        content_length is not None
+        and (not content_length.isdigit() or int(content_length) > remaining)
+    ):
+        raise _chunk_out_of_range(offset, content_length, meta["size_bytes"])
+    # the upload size limit applies to every chunk too, not only to the declared size
+    max_bytes = _max_upload_bytes()
+    if content_length is not None and offset + int(content_length) > max_bytes:
+        raise _file_too_large()
+    
+    # stream the body straight into the part file, never holding the whole chunk in memory
+    written = 0
+    async with aiofiles.open(part_path, "r+b") as f:
+        await f.seek(offset)
+        async for block in request.stream():
+            written += len(block)
+            if written > remaining:
+                raise _chunk_out_of_range(offset, written, meta["size_bytes"])
+            if offset + written > max_bytes:
+                raise _file_too_large()
+            await f.write(block)
+    end = offset + written
+    
+    # only record the range once the bytes are on disk
+    async with aiofiles.open(ranges_path, "a") as f:
+        await f.write(f"{offset} {end}\n")
+    
+    return UploadChunkResponse(upload_id=upload_id, offset=end, size_bytes=meta["size_bytes"])
+
+
+@router.get("/upload/{upload_id}", response_model=UploadChunkResponse)
+async def get_chunked_upload(upload_id: str) -> UploadChunkResponse:
+    # offset is how many bytes from the start have been received, resume from there
+    _, meta_path, ranges_path = _chunked_upload_paths(upload_id)
+    meta = await _read_upload_meta(meta_path)
+    
+    return UploadChunkResponse(
+        upload_id=upload_id,
+        offset=await _received_bytes(ranges_path),
+        size_bytes=meta["size_bytes"]
+    )
+
+
+@router.post("/upload/{upload_id}/finish", response_model=UploadResponse)
+async def finish_chunked_upload(upload_id: str) -> UploadResponse:
+    # validate the assembled file and create the processing job
+    part_path, meta_path, ranges_path = _chunked_upload_paths(upload_id)
+    meta = await _read_upload_meta(meta_path)
+    
+    received = await _received_bytes(ranges_path)
+    if received < meta["size_bytes"]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Upload incomplete: received {received} of {meta['size_bytes']} bytes"
+        )
+    
+    # claim the upload, a concurrent finish for the same id loses the rename and gets a 409
+    claim_path = meta_path.with_suffix(".finishing")
+    try:
+        os.rename(meta_path, claim_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=409, detail=f"Upload {upload_id} is already being finished")
+    
+    try:
+        safe_filename, file_path = _upload_file_path(meta["filename"])
+        os.replace(part_path, file_path)
+        claim_path.unlink(missing_ok=True)
+        ranges_path.unlink(missing_ok=True)
         
-        # Create job
-        file_info = {
-            "filename": file.filename,
-            "safe_filename": safe_filename,
-            "file_path": str(file_path),
-            "size_bytes": file_size,
-            "pages": page_count,
-            "max_pages": max_pages,
-            "extract_tables": extract_tables,
-            "uploaded_at": datetime.utcnow().isoformat()
-        }
-        
-        job_id = job_manager.create_job(file_info)
-        
-        return UploadResponse(
-            job_id=job_id,
-            status="pending",
-            message="pdf uploaded successfully. Use /process to start summarization.",
-            file_info=file_info
+        return await _register_upload(
+            file_path, meta["filename"], safe_filename, meta["max_pages"], meta["extract_tables"]
         )
         
     except HTTPException:
@@ -115,66 +580,72 @@ async def upload_pdf(
         )
 
 
-@router.post("/process", response_model=ProcessResponse)
+@router.post(
+    "/process",
+    response_model=ProcessResponse,
+    status_code=202,
+    description=(
+        "Start processing a pdf in the background. Always returns 202 Accepted with a "
+        "Location header pointing at /api/status/{job_id}, poll that for progress and results. "
+        "Calling it again for a job that is already processing or completed does nothing."
+    )
+)
 async def process_pdf(
     request: ProcessRequest,
-    background_tasks: BackgroundTasks
+    background_tasks: BackgroundTasks,
+    response: Response
 ) -> ProcessResponse:
     # Start processing a pdf in the background
     # Validate job exists
-    job = job_manager.get_job(request.job_id)
+    job = await job_manager.get_job(request.job_id)
     if not job:
         raise HTTPException(
             status_code=404,
             detail=f"Job {request.job_id} not found"
         )
     
-    # Check if already processing or completed
-    if job.status == JobState.PROCESSING:
-        raise HTTPException(
-            status_code=400,
-            detail="Job is already being processed"
-        )
+    response.headers["Location"] = f"/api/status/{request.job_id}"
     
-    if job.status == JobState.COMPLETED:
-        # Return existing result
+    # Already running or done, results are served by /status
+    if job.status in (JobState.PROCESSING, JobState.COMPLETED):
         return ProcessResponse(
-            job_id=job.job_id,
-            status="completed",
-            summary=job.summary,
-            entities=job.entities,
-            metadata=job.metadata,
-            processing_time_seconds=job.processing_time
+            job_id=request.job_id,
+            status=job.status.value,
+            metadata={"message": "Check /status/{job_id} for updates."}
         )
     
     # Set processing configuration
-    job_manager.set_job_processing_config(
+    await job_manager.set_job_processing_config(
         job_id=request.job_id,
         pdf_path=job.file_info['file_path'],
-        summary_mode=request.summary_mode.value,
-        llm_backend=request.llm_backend.value,
-        extract_entities=request.extract_entities,
-        entity_types=[et.value for et in request.entity_types] if request.entity_types else None
-    )
-    
-    # Start background processing
-    background_tasks.add_task(
-        process_pdf_background,
-        job_id=request.job_id,
         summary_mode=request.summary_mode,
         llm_backend=request.llm_backend,
         extract_entities=request.extract_entities,
         entity_types=request.entity_types
     )
     
-    # Update to processing state
-    job_manager.update_job_status(
+    # Update to processing state before handing off so the worker's
+    # progress updates are never overwritten
+    await job_manager.update_job_status(
         job_id=request.job_id,
         status=JobState.PROCESSING,
         progress=5,
         message="Processing started"
     )
     
+    # Start background processing
+    task_kwargs = dict(
+        job_id=request.job_id,
+        summary_mode=SummaryMode(request.summary_mode),
+        llm_backend=LLMBackend(request.llm_backend),
+        extract_entities=request.extract_entities,
+        entity_types=request.entity_types
+    )
+    if _task_queue is not None:
+        await _task_queue.enqueue_job("process_pdf", **task_kwargs)
+    else:
+        background_tasks.add_task(process_pdf_background, **task_kwargs)
+    
     return ProcessResponse(
         job_id=request.job_id,
         status="processing",
@@ -184,84 +655,146 @@ async def process_pdf(
         processing_time_seconds=None
     )
 
-@router.post("/summarize-sync")
+def _validate_sync_upload(file: UploadFile, max_pages: int):
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(400, "Only PDF files supported")
+    
+    if max_pages < 1 or max_pages > 10:
+        raise HTTPException(400, "max_pages must be 1-10")
+
+
+async def _extract_upload(file: UploadFile, max_pages: int) -> dict:
+    # extraction for the sync endpoints, the upload is never kept after the request
+    if not getattr(file.file, "_rolled", True):
+        # small upload still held in memory by starlette, parse it directly
+        await file.seek(0)
+        data = file.file.read()
+        if len(data) > _max_upload_bytes():
+            raise _file_too_large()
+        return await _run_extract(data, max_pages)
+    
+    # Save uploaded file temporarily
+    tmp_path = None
+    try:
+        async with aiofiles.tempfile.NamedTemporaryFile("wb", delete=False, suffix='.pdf') as tmp:
+            tmp_path = Path(tmp.name)
+            await _stream_upload(file, tmp)
+        
+        return await _run_extract(tmp_path, max_pages)
+    finally:
+        # clean up tmp file
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)
+
+
+@router.post("/summarize-sync", response_model=SyncSummaryResponse)
 async def summarize_pdf_sync(
     file: UploadFile = File(...),
     summary_mode: SummaryMode = SummaryMode.BRIEF,
     llm_backend: LLMBackend = LLMBackend.OPENAI,
     max_pages: int = 3
-):
+) -> SyncSummaryResponse:
     # Synchronous endpoint for task purposes only 
     # blocks until processing is done
     # async /upload + /process + /status endpoints will be better 
 
-    import tempfile
-    import time
-    
     # Validate
-    if not file.filename.lower().endswith('.pdf'):
-        raise HTTPException(400, "Only PDF files supported")
-    
-    if max_pages < 1 or max_pages > 10:
-        raise HTTPException(400, "max_pages must be 1-10")
+    _validate_sync_upload(file, max_pages)
     
     start_time = time.time()
     
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-            shutil.copyfileobj(file.file, tmp)
-            tmp_path = Path(tmp.name)
+        pdf_result = await _extract_upload(file, max_pages)
         
         # extract text
-        pdf_extractor = PDFExtractor(max_pages=max_pages)
-        pdf_result = pdf_extractor.extract_from_file(tmp_path, extract_tables=False)
         extracted_text = pdf_result['text']
         
         # extract entities
-        entity_extractor = EntityExtractor()
-        entities = entity_extractor.extract_entities(extracted_text)
+        entities = await _run_entities(extracted_text)
         
         # generate summary
-        llm_service = LLMServiceFactory.create(llm_backend)
-        summary = llm_service.summarize(extracted_text, mode=summary_mode)
-        model_info = llm_service.get_model_info()
-        
-        # clean up tmp file
-        tmp_path.unlink(missing_ok=True)
+        summary, model_info = await asyncio.to_thread(
+            _summarize, extracted_text, summary_mode, llm_backend
+        )
         
         processing_time = time.time() - start_time
         
         # Return result (Task 10 format)
-        return {
-            "document": file.filename,
-            "summary": summary,
-            "entities": [
-                {
-                    "type": e.type.value,
-                    "text": e.text,
-                    "value": e.value,
-                    "confidence": e.confidence
-                }
-                for e in entities
-            ],
-            "metadata": {
+        return SyncSummaryResponse(
+            document=file.filename,
+            summary=summary,
+            entities=entities,
+            metadata={
                 "model": model_info['model'],
                 "backend": model_info['backend'],
                 "summary_mode": summary_mode.value,
                 "entity_count": len(entities),
                 "text_length": len(extracted_text),
                 "pages_processed": pdf_result['page_count'],
+                "pages_extracted": pdf_result['pages_extracted'],
                 "processing_time_seconds": round(processing_time, 2)
             }
-        }
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        # Clean up on error
-        if 'tmp_path' in locals():
-            tmp_path.unlink(missing_ok=True)
         raise HTTPException(500, f"Processing failed: {str(e)}")
+
+
+@router.post("/summarize-sync/all", response_model=MultiSummaryResponse)
+async def summarize_pdf_sync_all(
+    file: UploadFile = File(...),
+    llm_backend: LLMBackend = LLMBackend.OPENAI,
+    max_pages: int = 3
+) -> MultiSummaryResponse:
+    # like /summarize-sync but returns a summary in every mode, the llm calls run
+    # concurrently so this takes about as long as the slowest mode
+    _validate_sync_upload(file, max_pages)
     
+    start_time = time.time()
+    
+    try:
+        pdf_result = await _extract_upload(file, max_pages)
+        extracted_text = pdf_result['text']
+        
+        # creating the hf service loads the model, keep that off the event loop
+        llm_service = await asyncio.to_thread(LLMServiceFactory.create, llm_backend)
+        modes = list(SummaryMode)
+        
+        entities, *summaries = await asyncio.gather(
+            _run_entities(extracted_text),
+            *(
+                llm_service.summarize_async(_llm_input(extracted_text, llm_backend), mode=mode)
+                for mode in modes
+            )
+        )
+        model_info = llm_service.get_model_info()
+        
+        processing_time = time.time() - start_time
+        
+        return MultiSummaryResponse(
+            document=file.filename,
+            summaries={mode.value: summary for mode, summary in zip(modes, summaries)},
+            entities=entities,
+            metadata={
+                "model": model_info['model'],
+                "backend": model_info['backend'],
+                "summary_modes": [mode.value for mode in modes],
+                "entity_count": len(entities),
+                "text_length": len(extracted_text),
+                "pages_processed": pdf_result['page_count'],
+                "pages_extracted": pdf_result['pages_extracted'],
+                "processing_time_seconds": round(processing_time, 2)
+            }
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(500, f"Processing failed: {str(e)}")
+
+
 
 async def process_pdf_background(
     job_id: str,
@@ -274,7 +807,7 @@ async def process_pdf_background(
     start_time = time.time()
     
     try:
-        job = job_manager.get_job(job_id)
+        job = await job_manager.get_job(job_id)
         if not job:
             logger.error(f"Job {job_id} not found in background task")
             return
@@ -284,60 +817,60 @@ async def process_pdf_background(
         extract_tables = job.file_info['extract_tables']
         
         # Extract PDF text
-        job_manager.update_job_status(
+        await job_manager.update_job_status(
             job_id=job_id,
             status=JobState.PROCESSING,
             progress=10,
             message="Extracting text from pdf"
         )
         
-        pdf_extractor = PDFExtractor(max_pages=max_pages)
-        pdf_result = pdf_extractor.extract_from_file(file_path, extract_tables=extract_tables)
+        # without entities only the llm reads the text, so extraction can stop at its budget
+        char_budget = None if extract_entities else LLMServiceFactory.char_budget(llm_backend)
+        pdf_result = await _run_extract(file_path, max_pages, extract_tables, char_budget)
         extracted_text = pdf_result['text']
         
         logger.info(f"Job {job_id}: Extracted {len(extracted_text)} characters")
         
-        # Extract entities 
-        entities = []
-        if extract_entities:
-            job_manager.update_job_status(
-                job_id=job_id,
-                status=JobState.PROCESSING,
-                progress=30,
-                message="Extracting entities from document"
-            )
-            
-            entity_extractor = EntityExtractor()
-            
-            # Convert entity type strings back to enum if provided
-            entity_type_filter = None
-            if entity_types:
-                from app.models.schemas import EntityType
-                entity_type_filter = entity_types
-            
-            entities = entity_extractor.extract_entities(
-                extracted_text,
-                entity_types=entity_type_filter
-            )
-            
-            logger.info(f"Job {job_id}: Extracted {len(entities)} entities")
-        
-        # Generate summary
-        job_manager.update_job_status(
+        # Entity extraction (cpu bound) and summarization (network bound) dont
+        # depend on each other so run them at the same time
+        await job_manager.update_job_status(
             job_id=job_id,
             status=JobState.PROCESSING,
-            progress=50,
-            message=f"Generating summary using {llm_backend.value}"
+            progress=30,
+            message=(
+                f"Extracting entities and generating summary using {llm_backend.value}"
+                if extract_entities
+                else f"Generating summary using {llm_backend.value}"
+            )
         )
         
-        llm_service = LLMServiceFactory.create(llm_backend)
-        summary = llm_service.summarize(extracted_text, mode=summary_mode)
-        model_info = llm_service.get_model_info()
+        summary_task = asyncio.ensure_future(asyncio.to_thread(
+            _summarize, extracted_text, summary_mode, llm_backend
+        ))
+        tasks = [summary_task]
+        entities_task = None
+        if extract_entities:
+            # entity_types are plain strings, EntityType is a str enum so they compare equal
+            entities_task = asyncio.ensure_future(_run_entities(extracted_text, entity_types))
+            tasks.append(entities_task)
+        
+        try:
+            await asyncio.gather(*tasks)
+        except Exception:
+            # dont leave the other stage running if one fails
+            for task in tasks:
+                task.cancel()
+            raise
         
+        summary, model_info = summary_task.result()
+        entities = entities_task.result() if entities_task else []
+        
+        if extract_entities:
+            logger.info(f"Job {job_id}: Extracted {len(entities)} entities")
         logger.info(f"Job {job_id}: Generated summary ({len(summary)} chars)")
         
         # Store results
-        job_manager.update_job_status(
+        await job_manager.update_job_status(
             job_id=job_id,
             status=JobState.PROCESSING,
             progress=90,
@@ -353,12 +886,14 @@ async def process_pdf_background(
             "entity_count": len(entities),
             "text_length": len(extracted_text),
             "pages_processed": pdf_result['page_count'],
+            "pages_extracted": pdf_result['pages_extracted'],
             "tables_extracted": len(pdf_result.get('tables', []))
         }
         
-        job_manager.set_job_results(
+        await job_manager.set_job_results(
             job_id=job_id,
-            extracted_text=extracted_text,
+            # the full text isnt needed once summarized and is the largest field by far
+            extracted_text=None,
             summary=summary,
             entities=entities,
             metadata=metadata,
@@ -366,7 +901,7 @@ async def process_pdf_background(
         )
         
         # mark as completed
-        job_manager.update_job_status(
+        await job_manager.update_job_status(
             job_id=job_id,
             status=JobState.COMPLETED,
             progress=100,
@@ -378,7 +913,7 @@ async def process_pdf_background(
     except Exception as e:
         # or mark as failed
         logger.error(f"Job {job_id} failed: {str(e)}")
-        job_manager.update_job_status(
+        await job_manager.update_job_status(
             job_id=job_id,
             status=JobState.FAILED,
             message="Processing failed",
@@ -386,27 +921,36 @@ async def process_pdf_background(
         )
 
 
+_STATUS_CACHE_CONTROL = "no-cache, must-revalidate"
+
+
+def _status_etag(job) -> str:
+    # changes whenever the job is updated, so pollers can revalidate cheaply
+    return f'W/"{job.updated_ns}-{job.status.value}-{job.progress}"'
+
+
 @router.get("/status/{job_id}", response_model=StatusResponse)
-async def get_job_status(job_id: str) -> StatusResponse:
+async def get_job_status(job_id: str, request: Request) -> StatusResponse:
     # Get status of a processing job
-    status = job_manager.get_job_status(job_id, include_result=True)
+    job = await job_manager.get_job(job_id)
     
-    if not status:
+    if not job:
         raise HTTPException(
             status_code=404,
             detail=f"Job {job_id} not found"
         )
     
-    # Convert to StatusResponse format
-    response = StatusResponse(
-        job_id=status['job_id'],
-        status=status['status'],
-        progress=status['progress'],
-        message=status['message'],
-        result=status.get('result'),
-        error_message=status.get('error_message'),
-        created_at=status['created_at'],
-        updated_at=status['updated_at']
-    )
+    # Nothing changed since the client's last poll, skip building the result
+    etag = _status_etag(job)
+    if request.headers.get("if-none-match") == etag:
+        return Response(
+            status_code=304,
+            headers={"ETag": etag, "Cache-Control": _STATUS_CACHE_CONTROL}
+        )
     
-    return response
\ No newline at end of file
+    # the body is already a validated StatusResponse, skip response_model re-validation
+    return Response(
+        content=job.status_body(),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": _STATUS_CACHE_CONTROL}
+    )
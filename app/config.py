@@ -1,20 +1,61 @@
-from pydantic_settings import BaseSettings
+from pydantic import AliasChoices, Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List
 
 class Settings(BaseSettings):
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
+    # 0 means one worker per cpu core (only used by python -m app.main)
+    API_WORKERS: int = 0
+    # processes in each api workers extraction / NER pool, 0 splits the cores across the api workers
+    CPU_POOL_WORKERS: int = 0
     DEBUG: bool = True
     OPENAI_API_KEY: str = ""
     MAX_FILE_SIZE_MB: int = 10
     ALLOWED_EXTENSIONS: List[str] = ["pdf"]
     UPLOAD_DIR: str = "uploads"
+    # unfinished chunked uploads with no chunk for this long are deleted
+    CHUNKED_UPLOAD_TTL_SECONDS: int = 3600
     DEFAULT_SUMMARY_MODE: str = "detailed"
     ENABLE_TABLE_EXTRACTION: bool = True
+    # tables come from PyMuPDF's find_tables by default, true uses pdfplumber (a second parse of the pdf)
+    USE_PDFPLUMBER_TABLES: bool = False
     ENABLE_ENTITY_EXTRACTION: bool = True
     DEFAULT_LLM_BACKEND: str = "openai"
-    HUGGINGFACE_MODEL: str = "facebook/bart-large-cnn"
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    # distilbart is about twice as fast as bart-large-cnn for ~97% of the rouge,
+    # set HF_SUMMARIZATION_MODEL=facebook/bart-large-cnn to get the old model back
+    HUGGINGFACE_MODEL: str = Field(
+        "sshleifer/distilbart-cnn-12-6",
+        validation_alias=AliasChoices("HF_SUMMARIZATION_MODEL", "HUGGINGFACE_MODEL")
+    )
+    # int8 dynamic quantization of the hf model on cpu, set false for full fp32 precision
+    HF_QUANTIZE: bool = True
+    # "torch" runs the model with pytorch, "ort" exports it once to onnx and runs it with
+    # onnx runtime (needs optimum[onnxruntime])
+    HF_BACKEND: str = "torch"
+    HF_ONNX_CACHE_DIR: str = "~/.cache/pdf-summariser/onnx"
+    # load the hf model in a background thread at startup instead of on the first hf request.
+    # done in the process that runs jobs, the arq worker or the api when REDIS_URL is empty
+    HF_PRELOAD: bool = True
+    # per process cache of entities keyed by text hash, 0 disables it
+    RESULT_CACHE_SIZE: int = 512
+    # extracted pdf text / tables keyed by the file content hash, 0 disables it
+    EXTRACT_CACHE_SIZE: int = 128
+    # llm summary cache, LLM_CACHE_DIR (eg ~/.cache/pdf-summariser) also keeps it on disk.
+    # the disk cache is a shelve file for a single process, it is ignored when REDIS_URL is set
+    LLM_CACHE_SIZE: int = 512
+    LLM_CACHE_TTL_SECONDS: int = 3600
+    LLM_CACHE_DIR: str = ""
+    # near duplicate summary lookup by embedding similarity (needs sentence-transformers + faiss-cpu)
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    SEMANTIC_CACHE_THRESHOLD: float = 0.97
+    # empty keeps jobs in memory and runs them as fastapi background tasks
+    REDIS_URL: str = ""
+    REDIS_JOB_TTL_SECONDS: int = 86400
+    # jobs one arq worker runs at once, 0 means one per cpu core
+    WORKER_MAX_JOBS: int = 0
+    # in memory job limit, least recently used finished jobs are evicted past it
+    MAX_JOBS: int = 1000
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 settings = Settings()
\ No newline at end of file
@@ -1,14 +1,21 @@
 
 # app main.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
+import os
 
 from app import __version__
-from app.api import router
+from app.api import router, shutdown_executors, init_task_queue, close_task_queue, api_worker_count, init_cpu_pool
+from app.api.middleware import BodySizeLimitMiddleware, MULTIPART_OVERHEAD_BYTES
 from app.models.schemas import HealthCheckResponse
+from app.config import settings
 from app.processors import job_manager
+from app.processors.llm_cache import close_caches
+from app.processors.llm_service import OpenAIService, preload_backends
 
 # Configure logging
 logging.basicConfig(
@@ -18,13 +25,34 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info(f"Starting PDF Summarizer v{__version__}")
+    init_cpu_pool()
+    await init_task_queue()
+    OpenAIService.warmup()
+    # with redis the arq worker runs the jobs and preloads there, a model per api worker
+    # would only cost memory
+    if not settings.REDIS_URL:
+        preload_backends()
+    yield
+    logger.info("Shutting down PDF Summarizer")
+    await close_task_queue()
+    await job_manager.close()
+    shutdown_executors()
+    close_caches()
+
+
 # Create fastapi app
 app = FastAPI(
     title="PDF summarizer api",
     description="MultiLLM pdf summarization and entity extraction",
     version=__version__,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -36,6 +64,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# refuse oversized uploads before fastapi spools the multipart body
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_body_bytes=settings.MAX_FILE_SIZE_MB * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES,
+    detail=f"File too large, max size is {settings.MAX_FILE_SIZE_MB} MB"
+)
+
 # Include API routes
 app.include_router(router, prefix="/api", tags=["PDF Processing"])
 
@@ -57,11 +92,11 @@ async def root():
 
 @app.get("/health", response_model=HealthCheckResponse)
 async def health_check():
-    stats = job_manager.get_stats()
+    stats = await job_manager.get_stats()
     
     return HealthCheckResponse(
         status="healthy",
-        timestamp=datetime.utcnow(),
+        timestamp=datetime.now(timezone.utc),
         version=__version__,
         services={
             "jobs_total": str(stats['total_jobs']),
@@ -73,11 +108,26 @@ async def health_check():
     )
 
 
-@app.on_event("startup")
-async def startup_event():
-    logger.info(f"Starting PDF Summarizer v{__version__}")
+def run():
+    # production entry point: python -m app.main
+    # for development use: uvicorn app.main:app --reload
+    import uvicorn
+    
+    workers = api_worker_count()
+    if workers < (settings.API_WORKERS or os.cpu_count() or 1):
+        # in memory jobs are per process, so /status would miss jobs from other workers
+        logger.warning("REDIS_URL not set, running a single worker")
+    
+    uvicorn.run(
+        "app.main:app",
+        host=settings.API_HOST,
+        port=settings.API_PORT,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        reload=False
+    )
 
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("Shutting down PDF Summarizer")
\ No newline at end of file
+if __name__ == "__main__":
+    run()
@@ -1,7 +1,23 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
-from enum import Enum
-from datetime import datetime
+from app.models.schemas import (
+    SummaryMode,
+    LLMBackend,
+    EntityType,
+    Entity,
+    JobStatus,
+    UploadRequest,
+    UploadResponse,
+    UploadInitRequest,
+    UploadChunkResponse,
+    ProcessRequest,
+    ProcessResponse,
+    SyncSummaryResponse,
+    MultiSummaryResponse,
+    StatusResponse,
+    ErrorResponse,
+    HealthCheckResponse,
+    create_job_id,
+    format_entity_value,
+)
 
 __all__ = [
     # enums
@@ -13,8 +29,12 @@ __all__ = [
     "JobStatus",
     "UploadRequest",
     "UploadResponse",
+    "UploadInitRequest",
+    "UploadChunkResponse",
     "ProcessRequest",
     "ProcessResponse",
+    "SyncSummaryResponse",
+    "MultiSummaryResponse",
     "StatusResponse",
     "ErrorResponse",
     "HealthCheckResponse",
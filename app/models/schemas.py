@@ -1,7 +1,7 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict, Any
 from enum import Enum
-from datetime import datetime
+from datetime import datetime, timezone
 
 class SummaryMode(str, Enum):
     # summary modes
@@ -30,8 +30,8 @@ class Entity(BaseModel):
     value: Optional[Any] = Field(None, description="Normalized value (eg datetime object for dates)")
     confidence: float = Field(default=1.0, ge=0.0, le=1.0, description="confidence score")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "type": "date",
                 "text": "February, 2025",
@@ -39,6 +39,16 @@ class Entity(BaseModel):
                 "confidence": 0.95
             }
         }
+    )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        # plain dict for the status response, skips the model_dump machinery
+        return {
+            "type": self.type.value,
+            "text": self.text,
+            "value": self.value,
+            "confidence": self.confidence
+        }
 
 
 class JobStatus(BaseModel):
@@ -50,8 +60,8 @@ class JobStatus(BaseModel):
     progress: Optional[int] = Field(None, ge=0, le=100, description="Progress percentage")
     error_message: Optional[str] = None
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "job_id": "abc123",
                 "status": "processing",
@@ -61,6 +71,7 @@ class JobStatus(BaseModel):
                 "error_message": None
             }
         }
+    )
 
 
 # Request/Response Models        
@@ -71,13 +82,14 @@ class UploadRequest(BaseModel):
     max_pages: Optional[int] = Field(3, ge=1, le=10, description="Maximum pages to process")
     extract_tables: bool = Field(True, description="Extract tables using pdfplumber ?")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "max_pages": 3,
                 "extract_tables": True
             }
         }
+    )
 
 
 class UploadResponse(BaseModel):
@@ -87,8 +99,8 @@ class UploadResponse(BaseModel):
     message: str
     file_info: Dict[str, Any] = Field(default_factory=dict, description="Metadata about uploaded file")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "job_id": "abc123",
                 "status": "pending",
@@ -100,6 +112,43 @@ class UploadResponse(BaseModel):
                 }
             }
         }
+    )
+
+
+class UploadInitRequest(BaseModel):
+    # Request model for starting a resumable chunked upload
+    filename: str
+    size_bytes: int = Field(..., gt=0, description="Total size of the file in bytes")
+    max_pages: int = Field(3, ge=1, le=3, description="Maximum pages to process")
+    extract_tables: bool = Field(True, description="Extract tables using pdfplumber ?")
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "filename": "contract.pdf",
+                "size_bytes": 245680,
+                "max_pages": 3,
+                "extract_tables": True
+            }
+        }
+    )
+
+
+class UploadChunkResponse(BaseModel):
+    # Progress of a resumable chunked upload
+    upload_id: str
+    offset: int = Field(..., description="Bytes received so far, send the next chunk from here")
+    size_bytes: int
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "upload_id": "3f2a9c0d8e7b4a61b5c2d3e4f5a6b7c8",
+                "offset": 1048576,
+                "size_bytes": 2456800
+            }
+        }
+    )
 
 
 class ProcessRequest(BaseModel):
@@ -113,8 +162,11 @@ class ProcessRequest(BaseModel):
         description="Specific entity types to extract. If None, extracts all types."
     )
     
-    class Config:
-        json_schema_extra = {
+    # enums arrive as plain strings, defaults are validated so they are strings too
+    model_config = ConfigDict(
+        use_enum_values=True,
+        validate_default=True,
+        json_schema_extra={
             "example": {
                 "job_id": "job_abc123",
                 "summary_mode": "brief",
@@ -123,6 +175,7 @@ class ProcessRequest(BaseModel):
                 "entity_types": ["date", "money", "organization"]
             }
         }
+    )
 
 
 class ProcessResponse(BaseModel):
@@ -134,8 +187,8 @@ class ProcessResponse(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Processing metadata")
     processing_time_seconds: Optional[float] = None
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "job_id": "job_abc123",
                 "status": "completed",
@@ -162,6 +215,72 @@ class ProcessResponse(BaseModel):
                 "processing_time_seconds": 4.5
             }
         }
+    )
+
+
+class SyncSummaryResponse(BaseModel):
+    # response from /summarize-sync
+    document: str
+    summary: str
+    entities: List[Entity] = Field(default_factory=list)
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="Processing metadata")
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "document": "invoice.pdf",
+                "summary": "Invoice from Acme Corp for consulting services totalling $4,500",
+                "entities": [
+                    {
+                        "type": "money",
+                        "text": "$4,500",
+                        "value": 4500.0,
+                        "confidence": 0.95
+                    }
+                ],
+                "metadata": {
+                    "model": "gpt-3.5-turbo",
+                    "backend": "openai",
+                    "summary_mode": "brief",
+                    "entity_count": 1,
+                    "text_length": 1832,
+                    "pages_processed": 1,
+                    "processing_time_seconds": 2.1
+                }
+            }
+        }
+    )
+
+
+class MultiSummaryResponse(BaseModel):
+    # response from /summarize-sync/all, one summary per mode
+    document: str
+    summaries: Dict[str, str] = Field(..., description="Summary keyed by summary mode")
+    entities: List[Entity] = Field(default_factory=list)
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="Processing metadata")
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "document": "invoice.pdf",
+                "summaries": {
+                    "brief": "Invoice from Acme Corp for consulting services totalling $4,500",
+                    "detailed": "Acme Corp invoices the client $4,500 for consulting services ...",
+                    "bullets": "• Invoice from Acme Corp\n• Consulting services\n• Total $4,500"
+                },
+                "entities": [],
+                "metadata": {
+                    "model": "gpt-3.5-turbo",
+                    "backend": "openai",
+                    "summary_modes": ["brief", "detailed", "bullets"],
+                    "entity_count": 0,
+                    "text_length": 1832,
+                    "pages_processed": 1,
+                    "processing_time_seconds": 2.3
+                }
+            }
+        }
+    )
 
 
 class StatusResponse(BaseModel):
@@ -175,8 +294,8 @@ class StatusResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "job_id": "job_abc123",
                 "status": "processing",
@@ -188,16 +307,17 @@ class StatusResponse(BaseModel):
                 "updated_at": "2024-01-15T10:30:15Z"
             }
         }
+    )
 
 class ErrorResponse(BaseModel):
     # error response model
     error: str
     detail: Optional[str] = None
     job_id: Optional[str] = None
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "error": "Processing failed",
                 "detail": "PDF file is corrupted or unreadable",
@@ -205,17 +325,18 @@ class ErrorResponse(BaseModel):
                 "timestamp": "2024-01-15T10:30:00Z"
             }
         }
+    )
 
 
 class HealthCheckResponse(BaseModel):
     # health chck
     status: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     version: str = "1.0.0"
     services: Dict[str, str] = Field(default_factory=dict)
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "status": "healthy",
                 "timestamp": "2024-01-15T10:30:00Z",
@@ -226,6 +347,7 @@ class HealthCheckResponse(BaseModel):
                 }
             }
         }
+    )
 
 
 # helper functions
@@ -1,26 +1,32 @@
 
-from app.processors.pdf_extractor import PDFExtractor, PDFExtractionError
-from app.processors.entity_extractor import EntityExtractor, EntityExtractionError
+from app.processors.pdf_extractor import PDFExtractor, PDFExtractionError, split_pages
+from app.processors.entity_extractor import EntityExtractor, EntityExtractionError, get_entity_extractor, set_ner_threads
 from app.processors.entity_filters import EntityFilter
 from app.processors.llm_service import (
     LLMServiceFactory, 
     LLMServiceError,
     OpenAIService,
-    HuggingFaceService
+    HuggingFaceService,
+    preload_backends
 )
-from app.processors.job_manager import JobManager, JobState, job_manager
+from app.processors.job_manager import JobManager, RedisJobManager, JobState, job_manager
 
 __all__ = [
     "PDFExtractor", 
     "PDFExtractionError",
+    "split_pages",
     "EntityExtractor",
     "EntityExtractionError",
+    "get_entity_extractor",
+    "set_ner_threads",
     "EntityFilter",
     "LLMServiceFactory",
     "LLMServiceError",
     "OpenAIService",
     "HuggingFaceService",
+    "preload_backends",
     "JobManager",
+    "RedisJobManager",
     "JobState",
     "job_manager",
 ]
\ No newline at end of file
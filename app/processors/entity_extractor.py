@@ -1,9 +1,13 @@
 #we use spacy amd regex for NER 
 
+import functools
+import os
 import re
 import spacy
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, FrozenSet, Optional, Tuple
+from datetime import date, datetime
 import logging
 
 from app.models.schemas import Entity, EntityType
@@ -12,17 +16,113 @@ from app.processors.entity_filters import EntityFilter
 
 logger = logging.getLogger(__name__)
 
+# google-re2 is a linear time DFA engine with the same api as re, use it when installed
+try:
+    import re2
+except ImportError:
+    re2 = None
+
 
 class EntityExtractionError(Exception):
     pass
 
 
+# long texts are split into overlapping chunks and run through spacy on a thread pool,
+# spacy's model code releases the GIL so this uses several cores
+PARALLEL_NER_THRESHOLD = 16_384
+_NER_WORKERS = min(4, os.cpu_count() or 1)
+_NER_EXECUTOR = ThreadPoolExecutor(max_workers=_NER_WORKERS)
+
+
+def set_ner_threads(threads: int) -> None:
+    # cpu pool processes call this from their initializer, pool size x NER threads has to
+    # stay within the cores. the executor it replaces has not started any threads yet
+    global _NER_WORKERS, _NER_EXECUTOR
+    _NER_WORKERS = max(1, min(4, threads))
+    _NER_EXECUTOR = ThreadPoolExecutor(max_workers=_NER_WORKERS)
+
+
+def _chunk_text(
+    text: str,
+    min_chunk: int = 8192,
+    overlap: int = 1024
+) -> List[Tuple[int, int, int, int]]:
+    # split text into (start, end, own_start, own_end) spans, cutting on the paragraph
+    # break nearest each target offset. Each chunk runs overlap chars past its cut so
+    # entities on the boundary are seen whole by at least one chunk, and a chunk only
+    # keeps entities starting inside its own range so overlap duplicates are dropped
+    cuts = [0]
+    n = len(text)
+    while cuts[-1] + min_chunk < n:
+        start = cuts[-1]
+        target = start + min_chunk
+        window = min_chunk // 2
+        
+        before = text.rfind("\n\n", start + window, target)
+        after = text.find("\n\n", target, target + window)
+        candidates = [i + 2 for i in (before, after) if i != -1]
+        cut = min(candidates, key=lambda c: abs(c - target)) if candidates else target
+        cuts.append(cut)
+    cuts.append(n)
+    
+    spans = []
+    half = overlap // 2
+    for i in range(len(cuts) - 1):
+        start, cut = cuts[i], cuts[i + 1]
+        end = min(n, cut + overlap)
+        own_start = 0 if i == 0 else start + half
+        own_end = n if cut == n else cut + half
+        spans.append((start, end, own_start, own_end))
+    return spans
+
+
+# strptime formats per date pattern index (see EntityExtractor.date_patterns),
+# commas are stripped before parsing
+DATE_FORMATS_BY_PATTERN = {
+    0: ("%b %d %Y", "%B %d %Y"),     # Jan 22 2013 / January 22 2013
+    1: ("%m/%d/%Y", "%d-%m-%Y"),     # 01/22/2013 / 22-01-2013
+}
+ISO_DATE_PATTERN = 2                 # 2013-01-22, parsed with date.fromisoformat
+ALL_DATE_FORMATS = (
+    "%b %d %Y",
+    "%B %d %Y",
+    "%m/%d/%Y",
+    "%d-%m-%Y",
+    "%Y-%m-%d",
+)
+
+
+# Map spacy entity labels to our EntityType enum
+SPACY_LABEL_MAPPING = {
+    "PERSON": EntityType.PERSON,
+    "ORG": EntityType.ORGANIZATION,
+    "GPE": EntityType.LOCATION,      # Geopolitical entity
+    "LOC": EntityType.LOCATION,      # Location
+}
+
+
+REGEX_TYPES = frozenset({EntityType.DATE, EntityType.MONEY})
+SPACY_TYPES = frozenset({EntityType.PERSON, EntityType.ORGANIZATION, EntityType.LOCATION})
+ALL_TYPES = frozenset(EntityType)
+
+
+def _types_to_extract(entity_types) -> FrozenSet[EntityType]:
+    # entity_types may be plain strings from the api, normalise them to EntityType members
+    if not entity_types:
+        return ALL_TYPES
+    return frozenset(EntityType(t) for t in entity_types)
+
+
 class EntityExtractor:
     # extracts entities from text using spaCy and regex patterns
     # the entity types supported are date, money, person, organization, location
+    # only doc.ents is used, so skip the components that dont feed ner
+    DISABLED_PIPES = ["tagger", "parser", "lemmatizer", "attribute_ruler"]
+    SPACY_BATCH_SIZE = 32
+    
     def __init__(self, spacy_model: str = "en_core_web_sm"):
         try:
-            self.nlp = spacy.load(spacy_model)
+            self.nlp = spacy.load(spacy_model, disable=self.DISABLED_PIPES)
             logger.info(f"Loaded spacy model: {spacy_model}")
         except OSError:
             raise EntityExtractionError(
@@ -59,9 +159,25 @@ class EntityExtractor:
             r'\b\d+(?:\.\d+)?%',
         ]
         
-        # Compile patterns
-        self.compiled_date_patterns = [re.compile(p, re.IGNORECASE) for p in self.date_patterns]
-        self.compiled_money_patterns = [re.compile(p) for p in self.money_patterns]
+        # Fuse everything into one alternation so the text is scanned once,
+        # match.lastgroup tells which pattern hit (date0, date1, ..., money0, ...)
+        named_patterns = (
+            [(f"date{i}", p, EntityType.DATE) for i, p in enumerate(self.date_patterns)]
+            + [(f"money{i}", p, EntityType.MONEY) for i, p in enumerate(self.money_patterns)]
+        )
+        self.group_types = {name: entity_type for name, _, entity_type in named_patterns}
+        self.group_index = {f"date{i}": i for i in range(len(self.date_patterns))}
+        # money patterns have no letters so ignoring case only affects the dates
+        combined = "(?i)" + "|".join(f"(?P<{name}>{p})" for name, p, _ in named_patterns)
+        self.combined_pattern = self._compile_combined(combined)
+    
+    def _compile_combined(self, pattern: str):
+        if re2 is not None:
+            try:
+                return re2.compile(pattern)
+            except Exception as e:
+                logger.warning(f"re2 could not compile entity patterns, using re: {str(e)}")
+        return re.compile(pattern)
     
     def extract_entities(
         self, 
@@ -71,103 +187,126 @@ class EntityExtractor:
         if not text or not text.strip():
             return []
         
-        entities = []
+        # (type, text) -> entity, duplicates are resolved as they are emitted
+        acc: Dict[Tuple[EntityType, str], Entity] = {}
         
         # Determine which entity types to extract
-        types_to_extract = entity_types if entity_types else list(EntityType)
+        types_to_extract = _types_to_extract(entity_types)
         
-        # Extract dates using regex
-        if EntityType.DATE in types_to_extract:
-            entities.extend(self._extract_dates(text))
-        
-        # Extract money using regex
-        if EntityType.MONEY in types_to_extract:
-            entities.extend(self._extract_money(text))
+        # Extract dates and money using regex in a single pass
+        if types_to_extract & REGEX_TYPES:
+            self._extract_regex_entities(acc, text, types_to_extract)
         
         # Extract named entities using spacy
-        spacy_types = [
-            t for t in types_to_extract 
-            if t in [EntityType.PERSON, EntityType.ORGANIZATION, EntityType.LOCATION]
-        ]
+        spacy_types = types_to_extract & SPACY_TYPES
         
         if spacy_types:
-            entities.extend(self._extract_spacy_entities(text, spacy_types))
-        
-        # Remove duplicate text and type
-        entities = self._deduplicate_entities(entities)
+            self._extract_spacy_entities(acc, text, spacy_types)
         
+        entities = list(acc.values())
         logger.info(f"Extracted {len(entities)} entities from text")
         return entities
     
-    def _extract_dates(self, text: str) -> List[Entity]:
-        dates = []
-        seen = set()  # Track already found dates
-        
-        for pattern in self.compiled_date_patterns:
-            for match in pattern.finditer(text):
-                date_text = match.group(0)
-                
-                # skip duplicates
-                if date_text in seen:
-                    continue
-                seen.add(date_text)
-                
-                # Try to parse the date
-                parsed_date = self._parse_date(date_text)
-                
-                dates.append(Entity(
-                    type=EntityType.DATE,
-                    text=date_text,
-                    value=parsed_date,
-                    confidence=0.9  # High confidence for regex matches
-                ))
-        
-        return dates
+    def extract_entities_batch(
+        self,
+        texts: List[str],
+        entity_types: Optional[List[EntityType]] = None
+    ) -> List[List[Entity]]:
+        # same as extract_entities for many texts (eg pages or several jobs),
+        # spacy runs them through nlp.pipe in batches
+        accs: List[Dict[Tuple[EntityType, str], Entity]] = [{} for _ in texts]
+        indices = [i for i, text in enumerate(texts) if text and text.strip()]
+        
+        types_to_extract = _types_to_extract(entity_types)
+        
+        if indices and types_to_extract & REGEX_TYPES:
+            for i in indices:
+                self._extract_regex_entities(accs[i], texts[i], types_to_extract)
+        
+        spacy_types = types_to_extract & SPACY_TYPES
+        
+        if indices and spacy_types:
+            docs = self.nlp.pipe((texts[i] for i in indices), batch_size=self.SPACY_BATCH_SIZE)
+            for i, doc in zip(indices, docs):
+                self._entities_from_spans(accs[i], doc.ents, spacy_types)
+        
+        results = [list(acc.values()) for acc in accs]
+        logger.info(f"Extracted {sum(len(r) for r in results)} entities from {len(texts)} texts")
+        return results
     
-    def _parse_date(self, date_str: str) -> Optional[str]:
-        # Common date formats to try
-        formats = [
-            "%b %d %Y",      # Jan 22 2013
-            "%B %d, %Y",     # January 22, 2013
-            "%m/%d/%Y",      # 01/22/2013
-            "%d-%m-%Y",      # 22-01-2013
-            "%Y-%m-%d",      # 2013-01-22 (ISO)
-        ]
+    def extract_entities_pages(
+        self,
+        pages: List[str],
+        entity_types: Optional[List[EntityType]] = None
+    ) -> List[Entity]:
+        # one document given as page texts, the pages go through extract_entities_batch
+        # together and the per page results are merged with the usual (type, text) rule
+        acc: Dict[Tuple[EntityType, str], Entity] = {}
+        for entities in self.extract_entities_batch(pages, entity_types):
+            for entity in entities:
+                self._add_entity(acc, entity)
+        return list(acc.values())
+    
+    def _add_entity(self, acc: Dict[Tuple[EntityType, str], Entity], entity: Entity):
+        # keep the higher confidence entity for each (type, text)
+        key = (entity.type, entity.text)
+        existing = acc.get(key)
+        if existing is None or entity.confidence > existing.confidence:
+            acc[key] = entity
+    
+    def _extract_regex_entities(
+        self,
+        acc: Dict[Tuple[EntityType, str], Entity],
+        text: str,
+        types_to_extract: FrozenSet[EntityType]
+    ):
+        for match in self.combined_pattern.finditer(text):
+            entity_type = self.group_types[match.lastgroup]
+            if entity_type not in types_to_extract:
+                continue
+            
+            match_text = match.group(0)
+            
+            # High confidence for regex dates, very high for money patterns
+            confidence = 0.9 if entity_type == EntityType.DATE else 0.95
+            
+            # skip duplicates before parsing the value
+            existing = acc.get((entity_type, match_text))
+            if existing is not None and existing.confidence >= confidence:
+                continue
+            
+            if entity_type == EntityType.DATE:
+                value = self._parse_date(match_text, self.group_index[match.lastgroup])
+            else:
+                value = self._parse_money(match_text)
+            
+            self._add_entity(acc, Entity(
+                type=entity_type,
+                text=match_text,
+                value=value,
+                confidence=confidence
+            ))
+    
+    def _parse_date(self, date_str: str, pattern_idx: Optional[int] = None) -> Optional[str]:
+        # the matching pattern already tells us the format, so only try the formats for it
+        cleaned = date_str.replace(',', '')
+        
+        if pattern_idx == ISO_DATE_PATTERN:
+            try:
+                return date.fromisoformat(cleaned).isoformat()
+            except ValueError:
+                return None
         
+        formats = DATE_FORMATS_BY_PATTERN.get(pattern_idx, ALL_DATE_FORMATS)
         for fmt in formats:
             try:
-                dt = datetime.strptime(date_str.replace(',', ''), fmt)
+                dt = datetime.strptime(cleaned, fmt)
                 return dt.strftime("%Y-%m-%d")
             except ValueError:
                 continue
         
         return None  # couldnt parse
     
-    def _extract_money(self, text: str) -> List[Entity]:
-        money_entities = []
-        seen = set()
-        
-        for pattern in self.compiled_money_patterns:
-            for match in pattern.finditer(text):
-                money_text = match.group(0)
-                
-                # skip duplicates
-                if money_text in seen:
-                    continue
-                seen.add(money_text)
-                
-                # Parse the numeric value
-                value = self._parse_money(money_text)
-                
-                money_entities.append(Entity(
-                    type=EntityType.MONEY,
-                    text=money_text,
-                    value=value,
-                    confidence=0.95  # Very high confidence for money patterns
-                ))
-        
-        return money_entities
-    
     def _parse_money(self, money_str: str) -> Optional[float]:
         try:
             # Remove currency symbols and commas
@@ -178,49 +317,55 @@ class EntityExtractor:
     
     def _extract_spacy_entities(
         self, 
+        acc: Dict[Tuple[EntityType, str], Entity],
         text: str, 
-        entity_types: List[EntityType]
-    ) -> List[Entity]:
-        entities = []
-        
+        entity_types: FrozenSet[EntityType]
+    ):
         # Process text with spacy
-        doc = self.nlp(text)
-        
-        # Map spacy entity labels to our EntityType enum
-        label_mapping = {
-            "PERSON": EntityType.PERSON,
-            "ORG": EntityType.ORGANIZATION,
-            "GPE": EntityType.LOCATION,      # Geopolitical entity
-            "LOC": EntityType.LOCATION,      # Location
-        }
+        if len(text) <= PARALLEL_NER_THRESHOLD:
+            self._entities_from_spans(acc, self.nlp(text).ents, entity_types)
+            return
+        
+        spans = _chunk_text(text)
+        
+        def run_group(group):
+            # one sub-batch of chunks per thread, the Language object is shared
+            docs = self.nlp.pipe(
+                (text[start:end] for start, end, _, _ in group),
+                batch_size=self.SPACY_BATCH_SIZE
+            )
+            kept = []
+            for (start, _, own_start, own_end), doc in zip(group, docs):
+                kept.extend(
+                    ent for ent in doc.ents
+                    if own_start <= start + ent.start_char < own_end
+                )
+            return kept
         
-        for ent in doc.ents:
+        groups = [spans[i::_NER_WORKERS] for i in range(min(_NER_WORKERS, len(spans)))]
+        ents = [ent for kept in _NER_EXECUTOR.map(run_group, groups) for ent in kept]
+        self._entities_from_spans(acc, ents, entity_types)
+    
+    def _entities_from_spans(
+        self,
+        acc: Dict[Tuple[EntityType, str], Entity],
+        ents,
+        entity_types: FrozenSet[EntityType]
+    ):
+        for ent in ents:
             # Check if this entity type is requested
-            entity_type = label_mapping.get(ent.label_)
+            entity_type = SPACY_LABEL_MAPPING.get(ent.label_)
             
             if entity_type and entity_type in entity_types:
                 # apply minimal filters to reduce obvious noise
                 if self.filter.should_keep_entity(ent.text, entity_type):
                     final_type = self.filter.reclassify_entity(ent.text, entity_type)
-                    entities.append(Entity(
+                    self._add_entity(acc, Entity(
                             type=final_type,
                             text=ent.text,
                             value=ent.text,
                             confidence=0.85
                         ))
-        
-        return entities
-    
-    def _deduplicate_entities(self, entities: List[Entity]) -> List[Entity]:
-        seen = {}
-        
-        for entity in entities:
-            key = (entity.type, entity.text)
-            
-            if key not in seen or entity.confidence > seen[key].confidence:
-                seen[key] = entity
-        
-        return list(seen.values())
     
     def extract_by_type(
         self, 
@@ -233,15 +378,24 @@ class EntityExtractor:
         if not entities:
             return {"total": 0, "by_type": {}, "avg_confidence": 0.0}
         
-        by_type = {}
+        # one pass for both the type counts and the confidence sum
+        by_type = Counter()
+        conf_sum = 0.0
         for entity in entities:
-            type_str = entity.type.value
-            by_type[type_str] = by_type.get(type_str, 0) + 1
+            by_type[entity.type.value] += 1
+            conf_sum += entity.confidence
         
-        avg_confidence = sum(e.confidence for e in entities) / len(entities)
+        avg_confidence = conf_sum / len(entities)
         
         return {
             "total": len(entities),
-            "by_type": by_type,
+            "by_type": dict(by_type),
             "avg_confidence": round(avg_confidence, 3)
-        }
\ No newline at end of file
+        }
+
+
+@functools.lru_cache(maxsize=4)
+def get_entity_extractor(spacy_model: str = "en_core_web_sm") -> EntityExtractor:
+    # shared extractor per model and process, spacy.load is slow and uses ~50MB per copy.
+    # a Language object is safe to share between threads for inference (each call builds its own Doc)
+    return EntityExtractor(spacy_model)
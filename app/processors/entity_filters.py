@@ -5,6 +5,10 @@ from app.models.schemas import EntityType
 
 class EntityFilter:
     # minimal filters for cleaning up obvious extraction noise
+    __slots__ = ()
+    
+    # Product/SKU codes like ABC-DE-1234
+    _SKU_RE = re.compile(r'^[A-Z]{3}-[A-Z]{2}-\d{4}$', re.IGNORECASE)
 
     def should_keep_entity(self, text: str, entity_type: EntityType) -> bool:
         # Remove leading/trailing whitespace for checks
@@ -24,13 +28,13 @@ class EntityFilter:
         
         # filter 4 Product/SKU codes
         # These seem to be consistently misclassified as organizations
-        if re.match(r'^[A-Z]{3}-[A-Z]{2}-\d{4}$', text.upper()):
+        if self._SKU_RE.match(text):
             return False
         
         return True
     
     def reclassify_entity(self, text: str, current_type: EntityType) -> EntityType:
-        text_lower = text.lower()
-        if current_type == EntityType.PERSON and 'governorate' in text_lower:
+        # only lowercase when it can matter
+        if current_type == EntityType.PERSON and 'governorate' in text.lower():
             return EntityType.LOCATION
         return current_type
\ No newline at end of file
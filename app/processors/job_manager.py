@@ -1,20 +1,29 @@
 
 #Async job management for pdf processing
+import json
 import logging
-from datetime import datetime
-from typing import Dict, Optional, Any
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any
 from threading import Lock
 from enum import Enum
+from pydantic import TypeAdapter
 
 from app.models.schemas import (
     JobStatus,
     ProcessResponse,
+    StatusResponse,
     Entity,
     create_job_id
 )
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# (de)serializes the entity list for redis in one pydantic-core call
+_ENTITY_LIST_ADAPTER = TypeAdapter(List[Entity])
+
 
 class JobState(str, Enum):
     # job states
@@ -24,13 +33,42 @@ class JobState(str, Enum):
     FAILED = "failed"
 
 
+# only jobs in these states are safe to evict
+_FINISHED_STATES = (JobState.COMPLETED, JobState.FAILED)
+
+
 class Job:
     # represents a processing job and its metadata
+    # slots keep per job memory small when many jobs are held in memory
+    __slots__ = (
+        "job_id",
+        "status",
+        "_created_ns",
+        "_updated_ns",
+        "progress",
+        "message",
+        "error_message",
+        "file_info",
+        "pdf_path",
+        "summary_mode",
+        "llm_backend",
+        "extract_entities",
+        "entity_types",
+        "extracted_text",
+        "summary",
+        "entities",
+        "metadata",
+        "processing_time",
+        "_result_cache",
+        "_status_body",
+    )
+    
     def __init__(self, job_id: str, file_info: Dict[str, Any]):
         self.job_id = job_id
         self.status = JobState.PENDING
-        self.created_at = datetime.utcnow()
-        self.updated_at = datetime.utcnow()
+        # plain int timestamps, converted to datetime only when a response is built
+        self._created_ns = time.time_ns()
+        self._updated_ns = self._created_ns
         self.progress = 0
         self.message = "Job created, awaiting processing"
         self.error_message: Optional[str] = None
@@ -51,6 +89,23 @@ class Job:
         self.entities: list[Entity] = []
         self.metadata: Dict[str, Any] = {}
         self.processing_time: Optional[float] = None
+        
+        # result dict built once the job completes, reused by every status poll
+        self._result_cache: Optional[Dict[str, Any]] = None
+        # serialized status response, kept once the job is finished
+        self._status_body: Optional[bytes] = None
+    
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self._created_ns / 1e9, tz=timezone.utc)
+    
+    @property
+    def updated_at(self) -> datetime:
+        return datetime.fromtimestamp(self._updated_ns / 1e9, tz=timezone.utc)
+    
+    @property
+    def updated_ns(self) -> int:
+        return self._updated_ns
     
     def to_status_response(self, include_result: bool = False) -> Dict[str, Any]:
         # convert job to status response dict
@@ -67,17 +122,78 @@ class Job:
         
         # include full result if job is completed and requested
         if include_result and self.status == JobState.COMPLETED:
-            response["result"] = {
-                "job_id": self.job_id,
-                "status": self.status.value,
-                "summary": self.summary,
-                "entities": [e.model_dump() for e in self.entities],
-                "metadata": self.metadata,
-                "processing_time_seconds": self.processing_time
-            }
+            if self._result_cache is None:
+                self._result_cache = self._build_result()
+            response["result"] = self._result_cache
         
         return response
     
+    def status_body(self) -> bytes:
+        # status json for the polling endpoint, a finished job is validated and
+        # serialized once instead of on every poll
+        if self._status_body is not None:
+            return self._status_body
+        
+        body = StatusResponse(**self.to_status_response(include_result=True)).model_dump_json().encode()
+        if self.status in _FINISHED_STATES:
+            self._status_body = body
+        return body
+    
+    def _build_result(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status.value,
+            "summary": self.summary,
+            "entities": [e.to_dict() for e in self.entities],
+            "metadata": self.metadata,
+            "processing_time_seconds": self.processing_time
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        # plain json friendly form, used by the redis backed manager
+        return {
+            "job_id": self.job_id,
+            "status": self.status.value,
+            "created_ns": self._created_ns,
+            "updated_ns": self._updated_ns,
+            "progress": self.progress,
+            "message": self.message,
+            "error_message": self.error_message,
+            "file_info": self.file_info,
+            "pdf_path": self.pdf_path,
+            "summary_mode": self.summary_mode,
+            "llm_backend": self.llm_backend,
+            "extract_entities": self.extract_entities,
+            "entity_types": self.entity_types,
+            "extracted_text": self.extracted_text,
+            "summary": self.summary,
+            "entities": _ENTITY_LIST_ADAPTER.dump_python(self.entities, mode="json"),
+            "metadata": self.metadata,
+            "processing_time": self.processing_time
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        # rebuild a job from to_dict output
+        job = cls(data["job_id"], data["file_info"])
+        job.status = JobState(data["status"])
+        job._created_ns = data["created_ns"]
+        job._updated_ns = data["updated_ns"]
+        job.progress = data["progress"]
+        job.message = data["message"]
+        job.error_message = data["error_message"]
+        job.pdf_path = data["pdf_path"]
+        job.summary_mode = data["summary_mode"]
+        job.llm_backend = data["llm_backend"]
+        job.extract_entities = data["extract_entities"]
+        job.entity_types = data["entity_types"]
+        job.extracted_text = data["extracted_text"]
+        job.summary = data["summary"]
+        job.entities = _ENTITY_LIST_ADAPTER.validate_python(data["entities"])
+        job.metadata = data["metadata"]
+        job.processing_time = data["processing_time"]
+        return job
+    
     def update_status(
         self, 
         status: JobState, 
@@ -87,7 +203,7 @@ class Job:
     ):
         # update job status and metadata
         self.status = status
-        self.updated_at = datetime.utcnow()
+        self._updated_ns = time.time_ns()
         
         if progress is not None:
             self.progress = progress
@@ -98,37 +214,74 @@ class Job:
         if error_message:
             self.error_message = error_message
         
+        # results are final once completed, serialize them once here
+        self._result_cache = self._build_result() if status == JobState.COMPLETED else None
+        self._status_body = None
+        
         logger.info(f"Job {self.job_id}: {status.value} - {message or 'No message'}")
 
 
 class JobManager:
     # Manages all jobs
+    # methods are async to match RedisJobManager, everything here is in memory and never awaits
     
-    def __init__(self):
-        self.jobs: Dict[str, Job] = {}
+    def __init__(self, max_jobs: int = 1000):
+        # oldest first, touched jobs are moved to the end
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.max_jobs = max_jobs
         self.lock = Lock()  # thread safe access to jobs dict
+        # job counts per status, kept in step with every write so get_stats is O(1)
+        self._by_status: Dict[str, int] = {s.value: 0 for s in JobState}
         logger.info("JobManager initialized")
     
-    def create_job(self, file_info: Dict[str, Any]) -> str:
+    async def create_job(self, file_info: Dict[str, Any]) -> str:
         job_id = create_job_id()
         
         with self.lock:
             job = Job(job_id, file_info)
             self.jobs[job_id] = job
+            self._by_status[job.status.value] += 1
+            self._evict_finished()
         
         logger.info(f"Created job {job_id} for file: {file_info.get('filename', 'unknown')}")
         return job_id
     
-    def get_job(self, job_id: str) -> Optional[Job]:
+    # get_job reorders the LRU and eviction iterates it, so both take the lock.
+    # only the plain membership test in job_exists is left lock free
+    
+    async def get_job(self, job_id: str) -> Optional[Job]:
         with self.lock:
-            return self.jobs.get(job_id)
+            job = self.jobs.get(job_id)
+            if job is not None:
+                self.jobs.move_to_end(job_id)
+            return job
+    
+    def _evict_finished(self):
+        # drop the least recently used completed / failed jobs once over max_jobs,
+        # pending and processing jobs are never evicted. caller holds the lock
+        excess = len(self.jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        
+        stale = []
+        for job_id, job in self.jobs.items():
+            if job.status in _FINISHED_STATES:
+                stale.append(job_id)
+                if len(stale) >= excess:
+                    break
+        
+        for job_id in stale:
+            job = self.jobs.pop(job_id)
+            self._by_status[job.status.value] -= 1
+        
+        if stale:
+            logger.info(f"Evicted {len(stale)} finished jobs")
     
-    def job_exists(self, job_id: str) -> bool:
+    async def job_exists(self, job_id: str) -> bool:
         """Check if job exists"""
-        with self.lock:
-            return job_id in self.jobs
+        return job_id in self.jobs
     
-    def update_job_status(
+    async def update_job_status(
         self,
         job_id: str,
         status: JobState,
@@ -136,12 +289,15 @@ class JobManager:
         message: Optional[str] = None,
         error_message: Optional[str] = None
     ):
-        job = self.get_job(job_id)
-        if job:
-            with self.lock:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job:
+                self._by_status[job.status.value] -= 1
                 job.update_status(status, progress, message, error_message)
+                self._by_status[job.status.value] += 1
+                self.jobs.move_to_end(job_id)
     
-    def set_job_processing_config(
+    async def set_job_processing_config(
         self,
         job_id: str,
         pdf_path: str,
@@ -150,69 +306,245 @@ class JobManager:
         extract_entities: bool = True,
         entity_types: Optional[list] = None
     ):
-        job = self.get_job(job_id)
-        if job:
-            with self.lock:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job:
                 job.pdf_path = pdf_path
                 job.summary_mode = summary_mode
                 job.llm_backend = llm_backend
                 job.extract_entities = extract_entities
                 job.entity_types = entity_types
     
-    def set_job_results(
+    async def set_job_results(
         self,
         job_id: str,
-        extracted_text: str,
+        extracted_text: Optional[str],
         summary: str,
         entities: list[Entity],
         metadata: Dict[str, Any],
         processing_time: float
     ):
-        job = self.get_job(job_id)
-        if job:
-            with self.lock:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job:
                 job.extracted_text = extracted_text
                 job.summary = summary
                 job.entities = entities
                 job.metadata = metadata
                 job.processing_time = processing_time
     
-    def get_job_status(self, job_id: str, include_result: bool = True) -> Optional[Dict[str, Any]]:
-        job = self.get_job(job_id)
+    async def get_job_status(self, job_id: str, include_result: bool = True) -> Optional[Dict[str, Any]]:
+        job = await self.get_job(job_id)
         if job:
             return job.to_status_response(include_result=include_result)
         return None
     
-    def get_all_jobs(self) -> Dict[str, Job]:
+    async def get_all_jobs(self) -> Dict[str, Job]:
+        # snapshot under the lock so eviction cant reorder it mid copy
         with self.lock:
-            return self.jobs.copy()
+            return dict(self.jobs)
     
-    def delete_job(self, job_id: str) -> bool:
+    async def delete_job(self, job_id: str) -> bool:
         with self.lock:
-            if job_id in self.jobs:
-                del self.jobs[job_id]
+            job = self.jobs.pop(job_id, None)
+            if job:
+                self._by_status[job.status.value] -= 1
                 logger.info(f"Deleted job {job_id}")
                 return True
         return False
     
-    def get_stats(self) -> Dict[str, Any]:
+    async def get_stats(self) -> Dict[str, Any]:
         with self.lock:
-            total = len(self.jobs)
-            by_status = {
-                "pending": 0,
-                "processing": 0,
-                "completed": 0,
-                "failed": 0
-            }
-            
-            for job in self.jobs.values():
-                by_status[job.status.value] += 1
-            
             return {
-                "total_jobs": total,
-                "by_status": by_status
+                "total_jobs": len(self.jobs),
+                "by_status": dict(self._by_status)
             }
+    
+    async def close(self):
+        pass
+
+
+# writes one or more fields of a job hash and moves the job between the per status
+# indexes in the same atomic step. an update for a job that no longer exists (deleted or
+# expired) is dropped instead of recreating it.
+# KEYS[1] job hash. ARGV[1] ttl seconds, ARGV[2] "1" when creating, ARGV[3] job id,
+# then json encoded field / value pairs
+_WRITE_JOB_SCRIPT = """
+if ARGV[2] ~= '1' and redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+local old = redis.call('HGET', KEYS[1], 'status')
+for i = 4, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+local ttl = tonumber(ARGV[1])
+redis.call('EXPIRE', KEYS[1], ttl)
+local new = redis.call('HGET', KEYS[1], 'status')
+if old and old ~= new then
+    redis.call('ZREM', '{prefix}' .. cjson.decode(old), ARGV[3])
+end
+-- scored by the keys expiry so get_stats can drop jobs the ttl removed
+local now = tonumber(redis.call('TIME')[1])
+redis.call('ZADD', '{prefix}' .. cjson.decode(new), now + ttl, ARGV[3])
+return 1
+"""
+
+
+class RedisJobManager:
+    # Same interface as JobManager but keeps job state in redis under job:{id}
+    # so every uvicorn / arq worker process sees the same jobs.
+    # uses the asyncio client so redis round trips never block the event loop.
+    # each job is a hash of json encoded Job.to_dict fields, updates only write the
+    # fields they change so the api and the arq worker never overwrite each other
+    
+    KEY_PREFIX = "job:"
+    # one sorted set of job ids per status, scored by when the job key expires
+    STATUS_PREFIX = "jobs:status:"
+    
+    def __init__(self, redis_url: str, ttl_seconds: int = 86400):
+        try:
+            import redis.asyncio as aioredis
+        except ImportError:
+            raise RuntimeError(
+                "redis package not installed, install it with pip"
+            )
+        
+        self.redis = aioredis.Redis.from_url(redis_url, decode_responses=True)
+        self.ttl_seconds = ttl_seconds
+        self._write_job = self.redis.register_script(
+            _WRITE_JOB_SCRIPT.replace("{prefix}", self.STATUS_PREFIX)
+        )
+        logger.info("RedisJobManager initialized")
+    
+    def _key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}{job_id}"
+    
+    async def _write(self, job_id: str, fields: Dict[str, Any], create: bool = False) -> bool:
+        args = [self.ttl_seconds, "1" if create else "0", job_id]
+        for name, value in fields.items():
+            args.extend((name, json.dumps(value)))
+        return bool(await self._write_job(keys=[self._key(job_id)], args=args))
+    
+    async def close(self):
+        await self.redis.aclose()
+    
+    async def create_job(self, file_info: Dict[str, Any]) -> str:
+        job_id = create_job_id()
+        await self._write(job_id, Job(job_id, file_info).to_dict(), create=True)
+        
+        logger.info(f"Created job {job_id} for file: {file_info.get('filename', 'unknown')}")
+        return job_id
+    
+    async def get_job(self, job_id: str) -> Optional[Job]:
+        raw = await self.redis.hgetall(self._key(job_id))
+        if not raw:
+            return None
+        return Job.from_dict({name: json.loads(value) for name, value in raw.items()})
+    
+    async def job_exists(self, job_id: str) -> bool:
+        return bool(await self.redis.exists(self._key(job_id)))
+    
+    async def update_job_status(
+        self,
+        job_id: str,
+        status: JobState,
+        progress: Optional[int] = None,
+        message: Optional[str] = None,
+        error_message: Optional[str] = None
+    ):
+        # same field rules as Job.update_status
+        fields: Dict[str, Any] = {"status": status.value, "updated_ns": time.time_ns()}
+        if progress is not None:
+            fields["progress"] = progress
+        if message:
+            fields["message"] = message
+        if error_message:
+            fields["error_message"] = error_message
+        
+        if await self._write(job_id, fields):
+            logger.info(f"Job {job_id}: {status.value} - {message or 'No message'}")
+    
+    async def set_job_processing_config(
+        self,
+        job_id: str,
+        pdf_path: str,
+        summary_mode: str,
+        llm_backend: str,
+        extract_entities: bool = True,
+        entity_types: Optional[list] = None
+    ):
+        await self._write(job_id, {
+            "pdf_path": pdf_path,
+            "summary_mode": summary_mode,
+            "llm_backend": llm_backend,
+            "extract_entities": extract_entities,
+            "entity_types": entity_types
+        })
+    
+    async def set_job_results(
+        self,
+        job_id: str,
+        extracted_text: Optional[str],
+        summary: str,
+        entities: list[Entity],
+        metadata: Dict[str, Any],
+        processing_time: float
+    ):
+        await self._write(job_id, {
+            "extracted_text": extracted_text,
+            "summary": summary,
+            "entities": _ENTITY_LIST_ADAPTER.dump_python(entities, mode="json"),
+            "metadata": metadata,
+            "processing_time": processing_time
+        })
+    
+    async def get_job_status(self, job_id: str, include_result: bool = True) -> Optional[Dict[str, Any]]:
+        job = await self.get_job(job_id)
+        if job:
+            return job.to_status_response(include_result=include_result)
+        return None
+    
+    async def get_all_jobs(self) -> Dict[str, Job]:
+        jobs = {}
+        async for key in self.redis.scan_iter(match=f"{self.KEY_PREFIX}*"):
+            job = await self.get_job(key[len(self.KEY_PREFIX):])
+            if job is not None:
+                jobs[job.job_id] = job
+        return jobs
+    
+    async def delete_job(self, job_id: str) -> bool:
+        # the key and its index entry go together, later updates see a missing key and are dropped
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self._key(job_id))
+            for state in JobState:
+                pipe.zrem(f"{self.STATUS_PREFIX}{state.value}", job_id)
+            results = await pipe.execute()
+        
+        if results[0]:
+            logger.info(f"Deleted job {job_id}")
+            return True
+        return False
+    
+    async def get_stats(self) -> Dict[str, Any]:
+        # jobs whose key has expired are trimmed from the indexes before counting
+        now, _ = await self.redis.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for state in JobState:
+                index_key = f"{self.STATUS_PREFIX}{state.value}"
+                pipe.zremrangebyscore(index_key, "-inf", now)
+                pipe.zcard(index_key)
+            results = await pipe.execute()
+        
+        by_status = {state.value: results[2 * i + 1] for i, state in enumerate(JobState)}
+        return {
+            "total_jobs": sum(by_status.values()),
+            "by_status": by_status
+        }
 
 
 # Global job manager instance
-job_manager = JobManager()
\ No newline at end of file
+# redis backed when REDIS_URL is set (needed for --workers N), in memory otherwise
+if settings.REDIS_URL:
+    job_manager = RedisJobManager(settings.REDIS_URL, ttl_seconds=settings.REDIS_JOB_TTL_SECONDS)
+else:
+    job_manager = JobManager(max_jobs=settings.MAX_JOBS)
\ No newline at end of file
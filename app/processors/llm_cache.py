@@ -0,0 +1,275 @@
+# cache of llm summaries, both backends are (near) deterministic for the same input
+# so a repeat pdf is a dict lookup instead of an api round trip or a model forward pass
+import functools
+import json
+import logging
+import os
+import re
+import shelve
+import time
+from threading import Lock
+from typing import Hashable, List, Optional, Tuple
+
+from app.config import settings
+from app.models.schemas import SummaryMode
+from app.processors.cache import LRUCache, content_key
+
+logger = logging.getLogger(__name__)
+
+
+def summary_key(
+    backend: str,
+    model: str,
+    mode: SummaryMode,
+    max_length: Optional[int],
+    text: str
+) -> Tuple:
+    return (backend, model, mode.value, max_length, content_key(text))
+
+
+class SummaryCache:
+    # ttl LRU in memory, in front of an optional shelve file so hits survive restarts
+    
+    def __init__(self, maxsize: int = 512, ttl_seconds: float = 3600, cache_dir: str = ""):
+        self.ttl_seconds = ttl_seconds
+        self._memory = LRUCache(maxsize, ttl_seconds=ttl_seconds)
+        self._disk = None
+        # shelve is not thread safe
+        self._disk_lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        
+        # dbm files are not safe with several writers, with REDIS_URL set the api workers and
+        # the arq worker would all open the same one, so the disk tier stays off
+        if cache_dir and maxsize > 0 and settings.REDIS_URL:
+            logger.warning("llm summary disk cache disabled, REDIS_URL means several processes would share it")
+        elif cache_dir and maxsize > 0:
+            path = os.path.expanduser(cache_dir)
+            try:
+                os.makedirs(path, exist_ok=True)
+                self._disk = shelve.open(os.path.join(path, "summaries"))
+                logger.info(f"llm summary disk cache at {path}")
+            except OSError as e:
+                logger.warning(f"llm summary disk cache disabled: {e}")
+    
+    @staticmethod
+    def _disk_key(key: Tuple) -> str:
+        return "|".join(str(part) for part in key)
+    
+    def get(self, key: Hashable) -> Optional[str]:
+        summary = self._memory.get(key)
+        
+        if summary is None and self._disk is not None:
+            with self._disk_lock:
+                entry = self._disk.get(self._disk_key(key))
+            # disk entries store wall clock time since they outlive the process
+            if entry is not None and time.time() - entry[0] < self.ttl_seconds:
+                summary = entry[1]
+                self._memory.set(key, summary)
+        
+        if summary is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            logger.info(f"llm summary cache hit ({self.hits} hits, {self.misses} misses)")
+        return summary
+    
+    def set(self, key: Hashable, summary: str):
+        self._memory.set(key, summary)
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk[self._disk_key(key)] = (time.time(), summary)
+    
+    def close(self):
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.close()
+                self._disk = None
+
+
+# page markers added by the pdf extractor, stripped so page layout drift doesnt change the embedding
+_PAGE_MARKER_RE = re.compile(r"=== Page \d+ ===")
+
+
+class SemanticCache:
+    # near duplicate lookup for texts that differ only by whitespace / header noise.
+    # the start, middle and end of each text are embedded and averaged into one vector,
+    # searched in a faiss inner product index (normalized vectors, so the score is cosine
+    # similarity). documents that only share a template opening differ further in
+    
+    # per window, about what the MiniLM encoder reads (256 tokens)
+    SNIPPET_CHARS = 1024
+    # neighbours looked at per namespace, all namespaces share one index
+    SEARCH_K = 4
+    # flat index has no cheap removal, so it just stops growing once full
+    MAX_ENTRIES = 10000
+    
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        threshold: float = 0.97,
+        cache_dir: str = ""
+    ):
+        try:
+            import faiss
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise RuntimeError(
+                "semantic cache needs sentence-transformers and faiss-cpu, install them with pip"
+            )
+        
+        self._faiss = faiss
+        self.threshold = threshold
+        self._encoder = SentenceTransformer(model_name)
+        dim = self._encoder.get_sentence_embedding_dimension()
+        
+        # row i of the index belongs to entries[i] = [namespace, summary]
+        self._index = faiss.IndexFlatIP(dim)
+        self._entries: List[list] = []
+        # distinct namespaces in the index, sizes the search so close matches from
+        # other modes / backends cant crowd out the one being looked up
+        self._namespaces: set = set()
+        self._lock = Lock()
+        
+        self._dir = os.path.expanduser(cache_dir) if cache_dir else ""
+        if self._dir:
+            self._load()
+        logger.info(f"semantic cache ready ({len(self._entries)} entries, model {model_name})")
+    
+    def _paths(self) -> Tuple[str, str]:
+        return (
+            # v2, vectors from the first snippet only are not comparable
+            os.path.join(self._dir, "semantic.v2.faiss"),
+            os.path.join(self._dir, "semantic.v2.json")
+        )
+    
+    def _load(self):
+        index_path, entries_path = self._paths()
+        if not (os.path.exists(index_path) and os.path.exists(entries_path)):
+            return
+        try:
+            index = self._faiss.read_index(index_path)
+            with open(entries_path) as f:
+                entries = json.load(f)
+        except Exception as e:
+            logger.warning(f"could not load semantic cache, starting empty: {e}")
+            return
+        if index.ntotal == len(entries) and index.d == self._index.d:
+            self._index, self._entries = index, entries
+            self._namespaces = {tuple(entry[0]) for entry in entries}
+    
+    def _embed(self, text: str):
+        cleaned = " ".join(_PAGE_MARKER_RE.sub(" ", text).split())
+        size = self.SNIPPET_CHARS
+        middle = max(0, (len(cleaned) - size) // 2)
+        windows = [cleaned[:size], cleaned[middle:middle + size], cleaned[-size:]]
+        vectors = self._encoder.encode(windows, normalize_embeddings=True, convert_to_numpy=True)
+        
+        # mean of the windows, renormalized so inner product stays cosine similarity
+        vector = vectors.mean(axis=0, keepdims=True).astype("float32")
+        self._faiss.normalize_L2(vector)
+        return vector
+    
+    def get(self, namespace: Tuple, text: str) -> Optional[str]:
+        # namespace is (backend, model, mode, max_length), only entries from the same one match
+        if not self._entries:
+            return None
+        vector = self._embed(text)
+        namespace = list(namespace)
+        with self._lock:
+            k = min(self.SEARCH_K * len(self._namespaces), len(self._entries))
+            scores, rows = self._index.search(vector, k)
+            for score, row in zip(scores[0], rows[0]):
+                if score < self.threshold:
+                    break
+                if row >= 0 and self._entries[row][0] == namespace:
+                    logger.info(f"semantic cache hit (similarity {score:.3f})")
+                    return self._entries[row][1]
+        return None
+    
+    def set(self, namespace: Tuple, text: str, summary: str):
+        if len(self._entries) >= self.MAX_ENTRIES:
+            return
+        vector = self._embed(text)
+        with self._lock:
+            self._index.add(vector)
+            self._entries.append([list(namespace), summary])
+            self._namespaces.add(tuple(namespace))
+    
+    def close(self):
+        if not self._dir:
+            return
+        index_path, entries_path = self._paths()
+        # every api / arq worker saves on shutdown, so each writes its own temp file and
+        # swaps it in. a mismatched index / entries pair is rejected by _load
+        suffix = f".{os.getpid()}.tmp"
+        with self._lock:
+            try:
+                os.makedirs(self._dir, exist_ok=True)
+                self._faiss.write_index(self._index, index_path + suffix)
+                with open(entries_path + suffix, "w") as f:
+                    json.dump(self._entries, f)
+                os.replace(index_path + suffix, index_path)
+                os.replace(entries_path + suffix, entries_path)
+            except Exception as e:
+                logger.warning(f"could not save semantic cache: {e}")
+
+
+class _NoSemanticCache:
+    # stand in when the semantic cache is disabled, keeps the llm services branch free
+    
+    def get(self, namespace: Tuple, text: str) -> Optional[str]:
+        return None
+    
+    def set(self, namespace: Tuple, text: str, summary: str):
+        pass
+    
+    def close(self):
+        pass
+
+
+# Global caches shared by every llm service in the process. built on first use, the
+# cpu pool children import this module too and never summarize, so they skip the shelve
+# file and the embedding model
+
+@functools.lru_cache(maxsize=1)
+def _summary_cache() -> SummaryCache:
+    return SummaryCache(
+        maxsize=settings.LLM_CACHE_SIZE,
+        ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+        cache_dir=settings.LLM_CACHE_DIR
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _semantic_cache():
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return _NoSemanticCache()
+    return SemanticCache(
+        model_name=settings.SEMANTIC_CACHE_MODEL,
+        threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+        cache_dir=settings.LLM_CACHE_DIR
+    )
+
+
+def cached_summary(key: Tuple, text: str) -> Optional[str]:
+    # exact match first, then the semantic lookup. key is a summary_key
+    summary = _summary_cache().get(key)
+    if summary is None:
+        summary = _semantic_cache().get(key[:4], text)
+        if summary is not None:
+            _summary_cache().set(key, summary)
+    return summary
+
+
+def store_summary(key: Tuple, text: str, summary: str):
+    _summary_cache().set(key, summary)
+    _semantic_cache().set(key[:4], text, summary)
+
+
+def close_caches():
+    # only caches this process actually built have anything to flush
+    if _summary_cache.cache_info().currsize:
+        _summary_cache().close()
+    if _semantic_cache.cache_info().currsize:
+        _semantic_cache().close()
@@ -1,11 +1,21 @@
 
+import asyncio
+import functools
+import hashlib
 import logging
+import queue
+import re
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
 from enum import Enum
 
 from app.models.schemas import SummaryMode, LLMBackend
 from app.config import settings
+from app.processors.llm_cache import cached_summary, store_summary, summary_key
 
 logger = logging.getLogger(__name__)
 
@@ -27,18 +37,81 @@ class BaseLLMService(ABC):
         # summarize the text
         pass
     
+    async def summarize_async(
+        self,
+        text: str,
+        mode: SummaryMode = SummaryMode.BRIEF,
+        max_length: Optional[int] = None
+    ) -> str:
+        # default runs the blocking summarize in a thread, so several modes can run at once
+        return await asyncio.to_thread(self.summarize, text, mode, max_length)
+    
     @abstractmethod
     def get_model_info(self) -> Dict[str, Any]:
         # model info
         pass
 
 
+# default openai max_tokens by mode
+_OPENAI_TOKEN_LIMITS = {
+    SummaryMode.BRIEF: 150,
+    SummaryMode.DETAILED: 500,
+    SummaryMode.BULLET_POINTS: 300
+}
+
+# Default hf (min, max) summary lengths by mode (in tokens, roughly 4 chars per token)
+_HF_LENGTH_RANGES = {
+    SummaryMode.BRIEF: (30, 60),
+    SummaryMode.DETAILED: (100, 200),
+    SummaryMode.BULLET_POINTS: (50, 100)
+}
+
+# sentence boundary: end punctuation, whitespace, then a capital. unlike split('.') this
+# leaves "U.S. firm", "3.14" and "e.g. this" alone
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+
+# fixed so it never breaks the prompt prefix that openai caches between requests
+_SYSTEM_PROMPT = "You are a helpful assistant that summarizes documents accurately and concisely."
+
+
+@functools.lru_cache(maxsize=4)
+def _get_openai_client(api_key: str, base_url: Optional[str] = None):
+    # one client (and so one keep alive connection pool) per key for the whole process,
+    # a new client per service would pay the tcp + tls handshake again
+    import httpx
+    from openai import OpenAI
+    
+    http_client = httpx.Client(
+        limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=180.0),
+        http2=True,
+        timeout=30.0
+    )
+    return OpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_async_openai_client(api_key: str, base_url: Optional[str] = None):
+    # async twin of _get_openai_client with the same pool settings
+    import httpx
+    from openai import AsyncOpenAI
+    
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=180.0),
+        http2=True,
+        timeout=30.0
+    )
+    return AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+
+
 class OpenAIService(BaseLLMService):
     # use gpt 3.5
     
+    # extracted text past ~10k tokens is not worth parsing for one prompt
+    CHAR_BUDGET = 40_000
+    
     def __init__(self, api_key: Optional[str] = None):
         try:
-            from openai import OpenAI
+            import openai  # noqa: F401
         except ImportError:
             raise LLMServiceError(
                 "openai package not installed, install it with pip"
@@ -50,10 +123,25 @@ class OpenAIService(BaseLLMService):
                 "no api key found"
             )
         
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = _get_openai_client(self.api_key)
         self.model = "gpt-3.5-turbo"
         logger.info(f"init openai service with model: {self.model}")
     
+    @classmethod
+    def warmup(cls):
+        # open the pooled connection in the background so the first summarize reuses it
+        if not settings.OPENAI_API_KEY:
+            return
+        
+        def _ping():
+            try:
+                _get_openai_client(settings.OPENAI_API_KEY).models.list()
+                logger.info("openai connection warmed up")
+            except Exception as e:
+                logger.warning(f"openai warmup failed: {e}")
+        
+        threading.Thread(target=_ping, name="openai-warmup", daemon=True).start()
+    
     def summarize(
         self, 
         text: str, 
@@ -63,39 +151,86 @@ class OpenAIService(BaseLLMService):
         if not text or not text.strip():
             raise LLMServiceError("Cannot summarize empty text")
         
-        # build the prompt based on mode
-        prompt = self._build_prompt(text, mode, max_length)
+        cache_key = summary_key("openai", self.model, mode, max_length, text)
+        cached = cached_summary(cache_key, text)
+        if cached is not None:
+            return cached
         
         try:
             response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant that summarizes documents accurately and concisely."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                # Low temp for more focused summaries
-                temperature=0.3,  
-                max_tokens=self._get_max_tokens(mode, max_length)
+                **self._completion_args(text, mode, max_length)
             )
             summary = response.choices[0].message.content.strip()
             logger.info(f"Generated {mode.value} summary using openai ({len(summary)} chars)")
             
+            store_summary(cache_key, text, summary)
             return summary
             
         except Exception as e:
             logger.error(f"openai summarization failed: {str(e)}")
             raise LLMServiceError(f"openai API err: {str(e)}")
     
+    async def summarize_async(
+        self,
+        text: str,
+        mode: SummaryMode = SummaryMode.BRIEF,
+        max_length: Optional[int] = None
+    ) -> str:
+        # same as summarize on the AsyncOpenAI client, concurrent calls overlap on the event loop
+        if not text or not text.strip():
+            raise LLMServiceError("Cannot summarize empty text")
+        
+        # the semantic cache embeds text on the cpu, keep it off the event loop
+        cache_key = summary_key("openai", self.model, mode, max_length, text)
+        cached = await asyncio.to_thread(cached_summary, cache_key, text)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await _get_async_openai_client(self.api_key).chat.completions.create(
+                **self._completion_args(text, mode, max_length)
+            )
+            summary = response.choices[0].message.content.strip()
+            logger.info(f"Generated {mode.value} summary using openai ({len(summary)} chars)")
+        except Exception as e:
+            logger.error(f"openai summarization failed: {str(e)}")
+            raise LLMServiceError(f"openai API err: {str(e)}")
+        
+        await asyncio.to_thread(store_summary, cache_key, text, summary)
+        return summary
+    
+    def _completion_args(self, text: str, mode: SummaryMode, max_length: Optional[int]) -> Dict[str, Any]:
+        # build the prompt based on mode, _build_prompt keeps the document first so
+        # openai prefix caching can reuse it across modes
+        prompt = self._build_prompt(text, mode, max_length)
+        
+        return {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": _SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            # Low temp for more focused summaries
+            "temperature": 0.3,
+            "max_tokens": self._get_max_tokens(mode, max_length)
+        }
+    
+    @staticmethod
+    def _document_prefix(text: str) -> str:
+        # the shared start of every prompt for a document
+        return f"Summarize the following document:\n\n{text}\n\n"
+    
     def _build_prompt(self, text: str, mode: SummaryMode, max_length: Optional[int]) -> str:
-        # build the prompt based on summary mode
+        # build the prompt based on summary mode, the document first and the mode / length
+        # instructions last so summaries of one pdf in several modes share a cacheable prefix
         
-        base_prompt = f"Summarize the following document:\n\n{text}\n\n"
+        base_prompt = self._document_prefix(text)
         
         if mode == SummaryMode.BRIEF:
             instruction = "Provide a brief 2-3 sentence summary highlighting ONLY the key points."
@@ -111,21 +246,16 @@ class OpenAIService(BaseLLMService):
         
         return base_prompt + instruction
     
-    def _get_max_tokens(self, mode: SummaryMode, max_length: Optional[int]) -> int:
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def _get_max_tokens(mode: SummaryMode, max_length: Optional[int]) -> int:
         # determine max tokens based on mode and requested length
         
         if max_length:
             # rough conversion is 1 word approx 1.3 tokens
             return int(max_length * 1.3)
         
-        # default token limits by mode
-        token_limits = {
-            SummaryMode.BRIEF: 150,
-            SummaryMode.DETAILED: 500,
-            SummaryMode.BULLET_POINTS: 300
-        }
-        
-        return token_limits.get(mode, 300)
+        return _OPENAI_TOKEN_LIMITS.get(mode, 300)
     
     def get_model_info(self) -> Dict[str, Any]:
         return {
@@ -137,9 +267,17 @@ class OpenAIService(BaseLLMService):
 
 
 class HuggingFaceService(BaseLLMService):
-    # use Bart large cnn model from huggingface
+    # local huggingface summarization model, distilbart cnn by default (HF_SUMMARIZATION_MODEL)
+    # concurrent summarize calls are queued and run through the model together,
+    # one forward pass over a batch is much cheaper than one per document
     
-    def __init__(self, model_name: str = "facebook/bart-large-cnn"):
+    BATCH_SIZE = 8
+    MAX_BATCH_DELAY = 0.05  # seconds to wait for more requests after the first
+    RESULT_TIMEOUT = 300  # seconds a caller waits on the batch worker before giving up
+    # about BATCH_SIZE chunks of 700 tokens, so a long document is still one forward pass
+    CHAR_BUDGET = 24_000
+    
+    def __init__(self, model_name: Optional[str] = None):
         try:
             from transformers import pipeline
         except ImportError:
@@ -147,14 +285,40 @@ class HuggingFaceService(BaseLLMService):
                 "transformers package not installed"
             )
         
+        model_name = model_name or settings.HUGGINGFACE_MODEL
         self.model_name = model_name
+        self.runtime = settings.HF_BACKEND
+        if self.runtime not in ("torch", "ort"):
+            raise LLMServiceError(f"Unknown HF_BACKEND: {self.runtime} (expected torch or ort)")
         
         try:
-            logger.info(f"Loading Huggingface model: {model_name} (this may take a moment...)")
-            self.summarizer = pipeline("summarization", model=model_name)
+            logger.info(f"Loading Huggingface model: {model_name} on {self.runtime} (this may take a moment...)")
+            if self.runtime == "ort":
+                self.summarizer = self._load_ort_pipeline(model_name)
+            else:
+                self.summarizer = pipeline("summarization", model=model_name)
+            # the pipelines own tokenizer, used to split long documents on token boundaries
+            self.tokenizer = self.summarizer.tokenizer
             logger.info(f"Successfully loaded Huggingface model: {model_name}")
+        except LLMServiceError:
+            raise
         except Exception as e:
             raise LLMServiceError(f"Failed to load Huggingface model: {str(e)}")
+        
+        # quantize_dynamic works on torch modules, the onnx graph is left as exported
+        if settings.HF_QUANTIZE and self.runtime == "torch":
+            self._quantize()
+        
+        # tiny forward pass so weight paging and allocator setup happen now, not on the first request
+        try:
+            self.summarizer("warmup", min_length=1, max_length=2, do_sample=False)
+        except Exception as e:
+            logger.warning(f"Huggingface warmup failed: {e}")
+        
+        # (text, min_length, max_length, future) items for the batch worker
+        self._queue: "queue.Queue[Tuple[str, int, int, Future]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._batch_worker, name="hf-batcher", daemon=True)
+        self._worker.start()
     
     def summarize(
         self, 
@@ -166,25 +330,29 @@ class HuggingFaceService(BaseLLMService):
         if not text or not text.strip():
             raise LLMServiceError("Cannot summarize empty text")
         
-        # Huggingface models have token limits around 1024 tokens for BART
-        # Truncate if needed rough: 1 token around 4 chars
-        max_input_length = 4000  # around 1000 tokens
-        if len(text) > max_input_length:
-            text = text[:max_input_length]
-            logger.warning(f"Truncated input text to {max_input_length} characters")
+        cache_key = summary_key("huggingface", self.model_name, mode, max_length, text)
+        cached = cached_summary(cache_key, text)
+        if cached is not None:
+            return cached
         
         # Determine length parameters
-        min_length, max_output_length = self._get_length_params(mode, max_length, len(text))
+        min_length, max_output_length = self._get_length_params(mode, max_length)
         
         try:
-            result = self.summarizer(
-                text,
-                min_length=min_length,
-                max_length=max_output_length,
-                do_sample=False  # Deterministic output
-            )
-            
-            summary = result[0]['summary_text'].strip()
+            # BART only sees ~1024 tokens, so long documents are split into chunks that
+            # are summarized together in one batch. the joined chunk summaries can be longer
+            # than one input too, so they are re-chunked and summarized again until one is left
+            chunks = self._chunk_text(text)
+            summaries = self._summarize_batch(chunks, min_length, max_output_length)
+            while len(summaries) > 1:
+                chunks = self._chunk_text(" ".join(summaries))
+                if 1 < len(chunks) >= len(summaries):
+                    # summaries as long as their inputs (large max_length), another round
+                    # wouldnt shrink them, so finish with one truncated pass
+                    chunks = [" ".join(summaries)]
+                logger.info(f"Combining {len(summaries)} summaries in {len(chunks)} chunks")
+                summaries = self._summarize_batch(chunks, min_length, max_output_length)
+            summary = summaries[0]
             
             # For bullet points mode, format the summary
             if mode == SummaryMode.BULLET_POINTS:
@@ -192,29 +360,138 @@ class HuggingFaceService(BaseLLMService):
             
             logger.info(f"Generated {mode.value} summary using Huggingface ({len(summary)} chars)")
             
+            store_summary(cache_key, text, summary)
             return summary
             
         except Exception as e:
             logger.error(f"Huggingface summarization failed: {str(e)}")
             raise LLMServiceError(f"Huggingface error: {str(e)}")
     
+    @staticmethod
+    def _load_ort_pipeline(model_name: str):
+        # onnx runtime handles the variable length inputs well and beats torch eager on cpu.
+        # the export is slow so it is done once and kept under HF_ONNX_CACHE_DIR
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+            from transformers import AutoTokenizer, pipeline
+        except ImportError:
+            raise LLMServiceError(
+                "optimum[onnxruntime] package not installed, install it with pip or set HF_BACKEND=torch"
+            )
+        
+        model_hash = hashlib.blake2b(model_name.encode("utf-8"), digest_size=8).hexdigest()
+        export_dir = Path(settings.HF_ONNX_CACHE_DIR).expanduser() / model_hash
+        
+        if (export_dir / "config.json").exists():
+            model = ORTModelForSeq2SeqLM.from_pretrained(export_dir)
+            tokenizer = AutoTokenizer.from_pretrained(export_dir)
+        else:
+            logger.info(f"Exporting {model_name} to onnx at {export_dir}")
+            model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+            tokenizer = AutoTokenizer.from_pretrained(model_name)
+            model.save_pretrained(export_dir)
+            tokenizer.save_pretrained(export_dir)
+        
+        return pipeline("summarization", model=model, tokenizer=tokenizer)
+    
+    def _quantize(self):
+        # int8 dynamic quantization of the linear layers, ~4x smaller weights and faster
+        # matmuls on cpu. the pipeline always runs on cpu here so bitsandbytes isnt needed
+        try:
+            import torch
+            
+            model = self.summarizer.model
+            if model.device.type != "cpu":
+                return
+            torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
+            logger.info(f"Quantized {self.model_name} to int8")
+        except Exception as e:
+            logger.warning(f"int8 quantization failed, using fp32 model: {e}")
+    
+    def _chunk_text(self, text: str, max_tokens: int = 700) -> List[str]:
+        ids = self.tokenizer.encode(text, add_special_tokens=False, verbose=False)
+        if len(ids) <= max_tokens:
+            return [text]
+        return [
+            self.tokenizer.decode(ids[i:i + max_tokens], skip_special_tokens=True)
+            for i in range(0, len(ids), max_tokens)
+        ]
+    
+    def _summarize_batch(self, texts: List[str], min_length: int, max_length: int) -> List[str]:
+        # queue every text before waiting so they land in the same batch
+        futures = []
+        for text in texts:
+            future: Future = Future()
+            self._queue.put((text, min_length, max_length, future))
+            futures.append(future)
+        return [future.result(timeout=self.RESULT_TIMEOUT) for future in futures]
+    
+    def _batch_worker(self):
+        # collect up to BATCH_SIZE requests, waiting at most MAX_BATCH_DELAY after the first
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.MAX_BATCH_DELAY
+            while len(batch) < self.BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            # min / max length are per call generation args, so only requests that
+            # share them can go through the same forward pass
+            groups: Dict[Tuple[int, int], List[Tuple[str, int, int, Future]]] = {}
+            for item in batch:
+                groups.setdefault((item[1], item[2]), []).append(item)
+            
+            for (min_length, max_length), items in groups.items():
+                try:
+                    self._run_batch(items, min_length, max_length)
+                except Exception as e:
+                    # the worker must outlive any one batch, or every later caller hangs
+                    logger.error(f"Huggingface batch failed: {e}")
+                    self._fail_pending(items, e)
+    
+    def _run_batch(self, items: List[Tuple[str, int, int, Future]], min_length: int, max_length: int):
+        # every future gets a result or an exception, including on malformed pipeline output
+        try:
+            results = self.summarizer(
+                [item[0] for item in items],
+                batch_size=len(items),
+                min_length=min_length,
+                max_length=max_length,
+                truncation=True,
+                do_sample=False  # Deterministic output
+            )
+            if len(results) != len(items):
+                raise LLMServiceError(f"Expected {len(items)} summaries, got {len(results)}")
+            
+            if len(items) > 1:
+                logger.info(f"Summarized a batch of {len(items)} documents")
+            for item, result in zip(items, results):
+                item[3].set_result(result['summary_text'].strip())
+        except Exception as e:
+            self._fail_pending(items, e)
+    
+    @staticmethod
+    def _fail_pending(items: List[Tuple[str, int, int, Future]], error: Exception):
+        for item in items:
+            if not item[3].done():
+                item[3].set_exception(error)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
     def _get_length_params(
-        self, 
         mode: SummaryMode, 
-        max_length: Optional[int],
-        text_length: int
+        max_length: Optional[int]
     ) -> tuple[int, int]:
         # calculate the minmax length param for the hf model
         
-        # Default ranges by mode (in tokens, roughly 4 chars per token)
-        if mode == SummaryMode.BRIEF:
-            min_len, max_len = 30, 60
-        elif mode == SummaryMode.DETAILED:
-            min_len, max_len = 100, 200
-        elif mode == SummaryMode.BULLET_POINTS:
-            min_len, max_len = 50, 100
-        else:
-            min_len, max_len = 50, 100
+        min_len, max_len = _HF_LENGTH_RANGES.get(mode, (50, 100))
         
         # Override if max_length specified
         if max_length:
@@ -225,37 +502,78 @@ class HuggingFaceService(BaseLLMService):
         return min_len, max_len
     
     def _format_as_bullets(self, text: str) -> str:
-        # Split on sentences and convert to bullets
-        sentences = [s.strip() for s in text.split('.') if s.strip()]
+        # Split on sentences and convert to bullets, punctuation stays with each sentence
+        sentences = [s.strip() for s in _SENTENCE_RE.split(text) if s.strip()]
         
         if len(sentences) <= 1:
             return f"• {text}"
         
-        return '\n'.join([f"• {sentence}." for sentence in sentences])
+        return '\n'.join(f"• {sentence}" for sentence in sentences)
     
     def get_model_info(self) -> Dict[str, Any]:
         return {
             "backend": "huggingface",
             "model": self.model_name,
+            "runtime": self.runtime,
             "provider": "Huggingface",
             "description": "Local summarization model (free)"
         }
 
 
+# one service per backend for the whole process, model weights and http pools are reused
+_SERVICE_CACHE: Dict[LLMBackend, BaseLLMService] = {}
+# per backend so loading the hf model doesnt block creating the openai service
+_SERVICE_LOCKS: Dict[LLMBackend, threading.Lock] = {backend: threading.Lock() for backend in LLMBackend}
+
+
 class LLMServiceFactory:
     
     @staticmethod
     def create(backend: LLMBackend) -> BaseLLMService:
 
-        #Create an LLM service instance
-        if backend == LLMBackend.OPENAI:
-            return OpenAIService()
-        elif backend == LLMBackend.HUGGINGFACE:
-            return HuggingFaceService()
-        else:
+        #Get the shared LLM service instance, created on first use
+        service = _SERVICE_CACHE.get(backend)
+        if service is not None:
+            return service
+        
+        if backend not in _SERVICE_LOCKS:
             raise LLMServiceError(f"Unknown backend: {backend}")
+        
+        with _SERVICE_LOCKS[backend]:
+            # the preload thread may have finished while we waited
+            service = _SERVICE_CACHE.get(backend)
+            if service is None:
+                if backend == LLMBackend.OPENAI:
+                    service = OpenAIService()
+                else:
+                    service = HuggingFaceService()
+                _SERVICE_CACHE[backend] = service
+        return service
+    
+    @staticmethod
+    def char_budget(backend: LLMBackend) -> Optional[int]:
+        # how much extracted text the backend will actually use, without creating the service
+        if backend == LLMBackend.OPENAI:
+            return OpenAIService.CHAR_BUDGET
+        if backend == LLMBackend.HUGGINGFACE:
+            return HuggingFaceService.CHAR_BUDGET
+        return None
     
     @staticmethod
     def get_available_backends() -> list[str]:
         #Get list of available backends
-        return [backend.value for backend in LLMBackend]
\ No newline at end of file
+        return [backend.value for backend in LLMBackend]
+
+
+def preload_backends():
+    # load the hf model in the background at startup so the first request doesnt pay for it
+    if not settings.HF_PRELOAD:
+        return
+    
+    def _load():
+        try:
+            LLMServiceFactory.create(LLMBackend.HUGGINGFACE)
+        except LLMServiceError as e:
+            logger.warning(f"Huggingface preload failed: {e}")
+    
+    threading.Thread(target=_load, name="hf-preload", daemon=True).start()
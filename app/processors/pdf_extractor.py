@@ -1,13 +1,32 @@
-# pdf text and table extraction service using PyMuPDF and pdfplumber
+# pdf text and table extraction service using PyMuPDF (and optionally pdfplumber for tables)
 
+import io
+import re
 import fitz 
 import pdfplumber
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Union
 from pathlib import Path
 import logging
 
+from app.config import settings
+
 logger = logging.getLogger(__name__)
 
+# pdfplumber parses the file on its own so its tables run here while the text runs on the
+# calling thread. threads are only started on first use so this is safe in forked pool workers
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pdf-tables")
+
+# page header put before each page's text
+_HEADER_TMPL = "=== Page {} ===\n{}"
+# the blank line before each page header, splits extracted text back into pages
+_PAGE_SPLIT_RE = re.compile(r"\n\n(?==== Page \d+ ===\n)")
+
+
+def split_pages(text: str) -> List[str]:
+    # per page texts (header included) of PDFExtractor output
+    return _PAGE_SPLIT_RE.split(text)
+
 
 class PDFExtractionError(Exception):
     # custom exception for pdf extraction errors
@@ -15,7 +34,7 @@ class PDFExtractionError(Exception):
 
 
 class PDFExtractor:
-    # handles pdf text and table extraction using PyMuPDF (for extraction and metadata) and pdfplumber (for table extraction)
+    # handles pdf text, metadata and table extraction using PyMuPDF, pdfplumber tables are opt in (USE_PDFPLUMBER_TABLES)
 
     def __init__(self, max_pages: int = 3):
         self.max_pages = max_pages
@@ -23,78 +42,165 @@ class PDFExtractor:
     def extract_from_file(
         self, 
         pdf_path: Path, 
-        extract_tables: bool = True
+        extract_tables: bool = True,
+        char_budget: Optional[int] = None
     ) -> Dict[str, Any]:
-        # extract text from pdf file
+        # extract text from pdf file, stopping after the page that reaches char_budget (if set)
 
         if not pdf_path.exists():
             raise PDFExtractionError(f"pdf file not found: {pdf_path}")
+        return self._extract(pdf_path, extract_tables, char_budget)
+    
+    def extract_from_bytes(
+        self,
+        data: bytes,
+        extract_tables: bool = True,
+        char_budget: Optional[int] = None
+    ) -> Dict[str, Any]:
+        # same as extract_from_file for a pdf that is already in memory, no temp file needed
+        if not data:
+            raise PDFExtractionError("pdf data is empty")
+        return self._extract(data, extract_tables, char_budget)
+    
+    def _extract(
+        self,
+        source: Union[Path, bytes],
+        extract_tables: bool,
+        char_budget: Optional[int] = None
+    ) -> Dict[str, Any]:
+        use_pdfplumber = extract_tables and settings.USE_PDFPLUMBER_TABLES
         try:
-            # extract text and metadata using PyMuPDF
-            text_data = self._extract_text_pymupdf(pdf_path)
+            # optional pdfplumber tables, in parallel with the text
+            tables_future = None
+            if use_pdfplumber:
+                tables_future = _EXECUTOR.submit(self._extract_tables_pdfplumber, source)
             
-            # optionally extract tables using pdfplumber
+            # text, metadata and (by default) tables all come from one parse of the pdf
             tables = []
-            if extract_tables:
-                tables = self._extract_tables_pdfplumber(pdf_path)
+            with self._open(source) as doc:
+                text_data = self._extract_text_pymupdf(doc, char_budget)
+                if extract_tables and not use_pdfplumber:
+                    tables = self._extract_tables_pymupdf(doc)
+            
+            # table errors are already caught inside, this only waits
+            if tables_future:
+                tables = tables_future.result()
             
             return {
                 "text": text_data["text"],
                 "metadata": text_data["metadata"],
                 "tables": tables,
                 "page_count": text_data["page_count"],
-                "extraction_method": "pymupdf + pdfplumber" if extract_tables else "pymupdf"
+                "pages_extracted": text_data["pages_extracted"],
+                "extraction_method": "pymupdf + pdfplumber" if use_pdfplumber else "pymupdf"
             }
             
         except Exception as e:
             logger.error(f"pdf extraction failed: {str(e)}")
             raise PDFExtractionError(f"Failed to extract pdf: {str(e)}")
     
-    def _extract_text_pymupdf(self, pdf_path: Path) -> Dict[str, Any]:
+    def get_page_count(self, pdf_path: Path) -> int:
+        # cheap validation, only reads the xref/trailer without extracting any text
+        if not pdf_path.exists():
+            raise PDFExtractionError(f"pdf file not found: {pdf_path}")
+        try:
+            with fitz.open(pdf_path) as doc:
+                if not doc.is_pdf:
+                    raise PDFExtractionError("file is not a pdf")
+                return doc.page_count
+        except PDFExtractionError:
+            raise
+        except Exception as e:
+            raise PDFExtractionError(f"Failed to open pdf: {str(e)}")
+    
+    @staticmethod
+    def _open(source: Union[Path, bytes]) -> "fitz.Document":
+        try:
+            if isinstance(source, Path):
+                return fitz.open(source)
+            return fitz.open(stream=source, filetype="pdf")
+        except Exception as e:
+            raise PDFExtractionError(f"Failed to open pdf: {str(e)}")
+    
+    def _extract_text_pymupdf(self, doc: "fitz.Document", char_budget: Optional[int] = None) -> Dict[str, Any]:
         #Extract text using PyMuPDF
         try:
-            doc = fitz.open(pdf_path)
-            
             # Get total page count before processing
             total_pages = len(doc)
             
             # Keep to the max pages limit
             pages_to_process = min(total_pages, self.max_pages)
             
-            # Extract text from each page
-            full_text = []
+            # Extract text from each page, "text" is the plain (fastest) extractor
+            full_text = [None] * pages_to_process
+            extracted_chars = 0
             for page_num in range(pages_to_process):
-                page = doc[page_num]
-                text = page.get_text()
-                full_text.append(f"=== Page {page_num + 1} ===\n{text}")
+                full_text[page_num] = _HEADER_TMPL.format(page_num + 1, doc[page_num].get_text("text"))
+                extracted_chars += len(full_text[page_num])
+                
+                # the llm wont read past its budget, so the remaining pages are skipped
+                if char_budget and extracted_chars >= char_budget and page_num + 1 < pages_to_process:
+                    del full_text[page_num + 1:]
+                    logger.info(f"Stopped text extraction after page {page_num + 1} ({extracted_chars} chars)")
+                    break
             
-            # Get metadata
+            # Get metadata, doc.metadata is a property so read it once.
+            # it is None for encrypted or broken files
+            doc_metadata = doc.metadata
+            if doc_metadata is None:
+                doc_metadata = {}
             metadata = {
-                "title": doc.metadata.get("title", ""),
-                "author": doc.metadata.get("author", ""),
-                "subject": doc.metadata.get("subject", ""),
-                "creator": doc.metadata.get("creator", ""),
-                "producer": doc.metadata.get("producer", ""),
-                "creation_date": doc.metadata.get("creationDate", ""),
+                "title": doc_metadata.get("title", ""),
+                "author": doc_metadata.get("author", ""),
+                "subject": doc_metadata.get("subject", ""),
+                "creator": doc_metadata.get("creator", ""),
+                "producer": doc_metadata.get("producer", ""),
+                "creation_date": doc_metadata.get("creationDate", ""),
             }
             
-            # Close document after getting all data
-            doc.close()
-            
             return {
                 "text": "\n\n".join(full_text),
                 "metadata": metadata,
-                "page_count": total_pages  # Use the variable we captured earlier
+                "page_count": total_pages,  # Use the variable we captured earlier
+                # pages actually read, lower than page_count past max_pages or char_budget
+                "pages_extracted": len(full_text)
             }
             
         except Exception as e:
             raise PDFExtractionError(f"PyMuPDF extraction failed: {str(e)}")
     
-    def _extract_tables_pdfplumber(self, pdf_path: Path) -> List[Dict[str, Any]]:
+    def _extract_tables_pymupdf(self, doc: "fitz.Document") -> List[Dict[str, Any]]:
+        # extract tables with PyMuPDF's own table finder, reusing the already open document
+        tables_data = []
+        try:
+            pages_to_process = min(doc.page_count, self.max_pages)
+            
+            for page_num in range(pages_to_process):
+                tables = doc[page_num].find_tables().tables
+                
+                for table_idx, table in enumerate(tables):
+                    rows = table.extract()
+                    if rows:  # Only add nonempty tables
+                        tables_data.append({
+                            "page": page_num + 1,
+                            "table_index": table_idx,
+                            "data": rows,
+                            "row_count": len(rows),
+                            "column_count": len(rows[0]) if rows else 0
+                        })
+            
+            logger.info(f"Extracted {len(tables_data)} tables from pdf")
+            return tables_data
+            
+        except Exception as e:
+            logger.warning(f"Table extraction failed: {str(e)}")
+            return []  # Dont fail entire extraction if tables fail
+    
+    def _extract_tables_pdfplumber(self, source: Union[Path, bytes]) -> List[Dict[str, Any]]:
         # extract tables using pdfplumber
         tables_data = []
         try:
-            with pdfplumber.open(pdf_path) as pdf:
+            with pdfplumber.open(source if isinstance(source, Path) else io.BytesIO(source)) as pdf:
                 pages_to_process = min(len(pdf.pages), self.max_pages)
                 
                 for page_num in range(pages_to_process):
@@ -0,0 +1,50 @@
+# arq worker for pdf processing jobs
+# run with: arq app.worker.WorkerSettings (needs REDIS_URL)
+import os
+
+from arq.connections import RedisSettings
+
+from app.api.routes import init_cpu_pool, process_pdf_background, shutdown_executors
+from app.config import settings
+from app.processors.job_manager import job_manager
+from app.processors.llm_cache import close_caches
+from app.processors.llm_service import OpenAIService, preload_backends
+
+
+async def process_pdf(
+    ctx,
+    job_id: str,
+    summary_mode,
+    llm_backend,
+    extract_entities: bool,
+    entity_types
+):
+    await process_pdf_background(
+        job_id=job_id,
+        summary_mode=summary_mode,
+        llm_backend=llm_backend,
+        extract_entities=extract_entities,
+        entity_types=entity_types
+    )
+
+
+async def startup(ctx):
+    # the worker isnt one of the api workers, its pool gets every core
+    init_cpu_pool(cores=os.cpu_count() or 1)
+    OpenAIService.warmup()
+    preload_backends()
+
+
+async def shutdown(ctx):
+    # same teardown as the api lifespan, the caches are saved to disk here
+    await job_manager.close()
+    shutdown_executors()
+    close_caches()
+
+
+class WorkerSettings:
+    functions = [process_pdf]
+    on_startup = startup
+    on_shutdown = shutdown
+    max_jobs = settings.WORKER_MAX_JOBS or os.cpu_count() or 1
+    redis_settings = RedisSettings.from_dsn(settings.REDIS_URL or "redis://localhost:6379")
@@ -7,9 +7,12 @@ How to use :
 """
 
 import click
+import functools
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
-import json
+import orjson
 from pathlib import Path
 from typing import Optional
 
@@ -17,6 +20,20 @@ from typing import Optional
 API_BASE_URL = "http://localhost:8000/api"
 TIMEOUT = 60 
 
+# one session for every request so commands reuse the same keep alive connection.
+# gateway errors are retried with backoff (0.5s, 1s, 2s)
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    # after the last retry the 5xx response is returned so callers can report its status code
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504], raise_on_status=False)
+))
+
+# keep alive session without retries for the startup probe, a down server should fail fast
+PROBE_SESSION = requests.Session()
+PROBE_SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0))
+
 
 class Colors:
    #terminal colors
@@ -53,12 +70,13 @@ def print_warning(text):
     print(f"{Colors.YELLOW} {text}{Colors.END}")
 
 
+@functools.lru_cache(maxsize=1)
 def check_server():
-    #Check if api server is running
+    #Check if api server is running, cached since each cli run is one short lived command
     try:
-        response = requests.get(f"{API_BASE_URL.replace('/api', '')}/health", timeout=2)
+        response = PROBE_SESSION.get(f"{API_BASE_URL.replace('/api', '')}/health", timeout=2)
         return response.status_code == 200
-    except requests.ConnectionError:
+    except requests.RequestException:
         return False
 
 
@@ -68,16 +86,21 @@ def wait_for_completion(job_id: str, max_wait: int = 60) -> Optional[dict]:
     
     start_time = time.time()
     last_progress = -1
+    # polls since progress last moved, drives the backoff
+    idle_polls = 0
     
     while time.time() - start_time < max_wait:
         try:
-            response = requests.get(f"{API_BASE_URL}/status/{job_id}")
+            response = SESSION.get(
+                f"{API_BASE_URL}/status/{job_id}",
+                headers={"Connection": "keep-alive"}
+            )
             
             if response.status_code != 200:
                 print_error(f"Status check failed: {response.status_code}")
                 return None
             
-            data = response.json()
+            data = orjson.loads(response.content)
             status = data['status']
             progress = data.get('progress', 0)
             message = data.get('message', '')
@@ -89,6 +112,7 @@ def wait_for_completion(job_id: str, max_wait: int = 60) -> Optional[dict]:
                 bar = '*' * filled + '' * (bar_length - filled)
                 print(f"\r{Colors.BLUE}[{bar}] {progress}%{Colors.END} - {message}", end='', flush=True)
                 last_progress = progress
+                idle_polls = 0
             
             if status == 'completed':
                 print()
@@ -99,7 +123,9 @@ def wait_for_completion(job_id: str, max_wait: int = 60) -> Optional[dict]:
                 print_error(f"Processing failed: {data.get('error_message', 'Unknown error')}")
                 return None
             
-            time.sleep(0.5)  # poll every 0.5 seconds
+            # back off while nothing changes: 0.15s, 0.22s, 0.34s ... capped at 2s
+            time.sleep(min(2.0, 0.15 * (1.5 ** idle_polls)))
+            idle_polls += 1
             
         except Exception as e:
             print_error(f"Error polling status: {e}")
@@ -118,9 +144,9 @@ def cli():
 @cli.command()
 @click.argument('pdf_file', type=click.Path(exists=True))
 @click.option('--mode', '-m', 
-              type=click.Choice(['brief', 'detailed', 'bullets'], case_sensitive=False),
+              type=click.Choice(['brief', 'detailed', 'bullets', 'all'], case_sensitive=False),
               default='brief',
-              help='Summary mode')
+              help='Summary mode (all = every mode at once, always synchronous)')
 @click.option('--backend', '-b',
               type=click.Choice(['openai', 'hf'], case_sensitive=False),
               default='openai',
@@ -154,6 +180,10 @@ def summarize(pdf_file, mode, backend, max_pages, entities, output, sync):
     print_info(f"Backend: {backend.upper()}")
     print_info(f"Max pages: {max_pages}")
     
+    # every mode in one request, the server runs the llm calls concurrently
+    if mode == 'all':
+        sync = True
+    
     # Use sync endpoint if requested
     if sync:
         print_info("Using synch processing")
@@ -162,14 +192,17 @@ def summarize(pdf_file, mode, backend, max_pages, entities, output, sync):
             with open(pdf_path, 'rb') as f:
                 files = {'file': (pdf_path.name, f, 'application/pdf')}
                 data = {
-                    'summary_mode': mode,
                     'llm_backend': backend,
                     'max_pages': max_pages
                 }
+                endpoint = f"{API_BASE_URL}/summarize-sync/all"
+                if mode != 'all':
+                    data['summary_mode'] = mode
+                    endpoint = f"{API_BASE_URL}/summarize-sync"
                 
                 print(f"\n{Colors.YELLOW} Processing {Colors.END}")
-                response = requests.post(
-                    f"{API_BASE_URL}/summarize-sync",
+                response = SESSION.post(
+                    endpoint,
                     files=files,
                     data=data,
                     timeout=30
@@ -180,7 +213,7 @@ def summarize(pdf_file, mode, backend, max_pages, entities, output, sync):
                 print_error(response.text)
                 return
             
-            result = response.json()
+            result = orjson.loads(response.content)
             display_results(result, output)
             
         except Exception as e:
@@ -199,14 +232,14 @@ def summarize(pdf_file, mode, backend, max_pages, entities, output, sync):
                     'max_pages': max_pages,
                     'extract_tables': True
                 }
-                response = requests.post(f"{API_BASE_URL}/upload", files=files, params=params)
+                response = SESSION.post(f"{API_BASE_URL}/upload", files=files, params=params)
             
             if response.status_code != 200:
                 print_error(f"Upload failed: {response.status_code}")
                 print_error(response.text)
                 return
             
-            upload_data = response.json()
+            upload_data = orjson.loads(response.content)
             job_id = upload_data['job_id']
             print_success(f"Uploaded! Job ID: {job_id}")
             
@@ -221,9 +254,9 @@ def summarize(pdf_file, mode, backend, max_pages, entities, output, sync):
                 'entity_types': ['date', 'money', 'person', 'organization', 'location'] if entities else None
             }
             
-            response = requests.post(f"{API_BASE_URL}/process", json=process_data)
+            response = SESSION.post(f"{API_BASE_URL}/process", json=process_data)
             
-            if response.status_code != 200:
+            if response.status_code != 202:
                 print_error(f"Process request failed: {response.status_code}")
                 print_error(response.text)
                 return
@@ -245,8 +278,13 @@ def summarize(pdf_file, mode, backend, max_pages, entities, output, sync):
 
 def display_results(result: dict, output_file: Optional[str] = None):
     
-    print_header("SUMMARY")
-    print(result['summary'])
+    if 'summaries' in result:
+        for summary_mode, summary in result['summaries'].items():
+            print_header(f"SUMMARY ({summary_mode.upper()})")
+            print(summary)
+    else:
+        print_header("SUMMARY")
+        print(result['summary'])
     
     if 'entities' in result and result['entities']:
         print_header(f"ENTITIES ({result['metadata']['entity_count']} found)")
@@ -279,8 +317,8 @@ def display_results(result: dict, output_file: Optional[str] = None):
     # Save to file if requested
     if output_file:
         output_path = Path(output_file)
-        with open(output_path, 'w') as f:
-            json.dump(result, f, indent=2, default=str)
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2, default=str))
         print(f"\n{Colors.GREEN} Saved to: {output_path}{Colors.END}")
 
 
@@ -298,7 +336,7 @@ def status(job_id, output):
         return
     
     try:
-        response = requests.get(f"{API_BASE_URL}/status/{job_id}")
+        response = SESSION.get(f"{API_BASE_URL}/status/{job_id}")
         
         if response.status_code == 404:
             print_error("Job not found!")
@@ -308,7 +346,7 @@ def status(job_id, output):
             print_error(f"Error: {response.status_code}")
             return
         
-        data = response.json()
+        data = orjson.loads(response.content)
         
         print(f"Status: {Colors.BOLD}{data['status'].upper()}{Colors.END}")
         print(f"Progress: {data['progress']}%")
@@ -337,13 +375,13 @@ def list_jobs():
         return
     
     try:
-        response = requests.get(f"{API_BASE_URL}/jobs")
+        response = SESSION.get(f"{API_BASE_URL}/jobs")
         
         if response.status_code != 200:
             print_error(f"Error: {response.status_code}")
             return
         
-        data = response.json()
+        data = orjson.loads(response.content)
         
         if data['total'] == 0:
             print_info("No jobs found")
@@ -381,7 +419,7 @@ def delete(job_id):
         return
     
     try:
-        response = requests.delete(f"{API_BASE_URL}/jobs/{job_id}")
+        response = SESSION.delete(f"{API_BASE_URL}/jobs/{job_id}")
         
         if response.status_code == 404:
             print_error("Job not found!")
@@ -391,7 +429,7 @@ def delete(job_id):
             print_error(f"Error: {response.status_code}")
             return
         
-        result = response.json()
+        result = orjson.loads(response.content)
         print_success(result['message'])
         
     except Exception as e:
@@ -404,13 +442,13 @@ def health():
     print_header("API HEALTH CHECK")
     
     try:
-        response = requests.get(f"{API_BASE_URL.replace('/api', '')}/health", timeout=5)
+        response = SESSION.get(f"{API_BASE_URL.replace('/api', '')}/health", timeout=5)
         
         if response.status_code != 200:
             print_error(f"Server unhealthy: {response.status_code}")
             return
         
-        data = response.json()
+        data = orjson.loads(response.content)
         
         print_success(f"Status: {data['status']}")
         print(f"Version: {data['version']}")
@@ -0,0 +1,22 @@
+# shared test setup, the settings are read once at import so the environment is set first
+import os
+
+os.environ["REDIS_URL"] = ""
+os.environ["HF_PRELOAD"] = "false"
+os.environ["OPENAI_API_KEY"] = ""
+os.environ["LLM_CACHE_DIR"] = ""
+os.environ["SEMANTIC_CACHE_ENABLED"] = "false"
+os.environ["MAX_FILE_SIZE_MB"] = "1"
+
+import fitz
+import pytest
+
+
+@pytest.fixture
+def pdf_bytes() -> bytes:
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "Paid $1,250.00 on Jan 22, 2013.")
+    data = doc.tobytes()
+    doc.close()
+    return data
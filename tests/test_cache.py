@@ -0,0 +1,66 @@
+from app.processors import cache
+from app.processors.cache import LRUCache, bytes_key, content_key, file_key
+
+
+def test_evicts_least_recently_used():
+    lru = LRUCache(maxsize=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    # reading a makes b the oldest
+    assert lru.get("a") == 1
+    lru.set("c", 3)
+    
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+    assert len(lru) == 2
+
+
+def test_counts_hits_and_misses():
+    lru = LRUCache(maxsize=4)
+    lru.set("a", 1)
+    lru.get("a")
+    lru.get("missing")
+    
+    assert (lru.hits, lru.misses) == (1, 1)
+
+
+def test_zero_size_stores_nothing():
+    lru = LRUCache(maxsize=0)
+    lru.set("a", 1)
+    
+    assert lru.get("a") is None
+    assert len(lru) == 0
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    lru = LRUCache(maxsize=4, ttl_seconds=10)
+    lru.set("a", 1)
+    
+    now[0] += 9
+    assert lru.get("a") == 1
+    now[0] += 1
+    assert lru.get("a") is None
+    assert len(lru) == 0
+
+
+def test_set_refreshes_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    lru = LRUCache(maxsize=4, ttl_seconds=10)
+    lru.set("a", 1)
+    now[0] += 8
+    lru.set("a", 2)
+    now[0] += 8
+    
+    assert lru.get("a") == 2
+
+
+def test_keys_are_stable_digests(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"%PDF-1.4 test")
+    
+    assert file_key(path) == bytes_key(b"%PDF-1.4 test")
+    assert content_key("abc") == content_key("abc") != content_key("abd")
@@ -0,0 +1,61 @@
+import pytest
+
+from app.models.schemas import EntityType
+from app.processors.entity_extractor import EntityExtractor
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    # only the regex side is under test, so the spacy model is never loaded
+    instance = EntityExtractor.__new__(EntityExtractor)
+    instance._compile_patterns()
+    return instance
+
+
+def _regex_entities(extractor, text, types=frozenset({EntityType.DATE, EntityType.MONEY})):
+    acc = {}
+    extractor._extract_regex_entities(acc, text, types)
+    return {(e.type, e.text): e for e in acc.values()}
+
+
+@pytest.mark.parametrize("text, value", [
+    ("Jan 22, 2013", "2013-01-22"),
+    ("January 22 2013", "2013-01-22"),
+    ("01/22/2013", "2013-01-22"),
+    ("22-01-2013", "2013-01-22"),
+    ("2013-01-22", "2013-01-22"),
+])
+def test_each_date_pattern_maps_to_its_format(extractor, text, value):
+    found = _regex_entities(extractor, f"signed on {text} by both parties")
+    
+    assert found[(EntityType.DATE, text)].value == value
+
+
+def test_invalid_iso_date_has_no_value(extractor):
+    found = _regex_entities(extractor, "ref 2013-13-45")
+    
+    assert found[(EntityType.DATE, "2013-13-45")].value is None
+
+
+def test_money_and_percentages(extractor):
+    found = _regex_entities(extractor, "a fee of $1,234.56 and a rate of 1.5%")
+    
+    assert found[(EntityType.MONEY, "$1,234.56")].value == 1234.56
+    assert found[(EntityType.MONEY, "1.5%")].value == 1.5
+    assert found[(EntityType.MONEY, "$1,234.56")].confidence == 0.95
+
+
+def test_one_pass_finds_dates_and_money_together(extractor):
+    found = _regex_entities(extractor, "On 2013-01-22 we paid $500 (10%). On 2013-01-22 again.")
+    
+    assert set(found) == {
+        (EntityType.DATE, "2013-01-22"),
+        (EntityType.MONEY, "$500"),
+        (EntityType.MONEY, "10%"),
+    }
+
+
+def test_types_not_requested_are_skipped(extractor):
+    found = _regex_entities(extractor, "paid $500 on 2013-01-22", frozenset({EntityType.MONEY}))
+    
+    assert set(found) == {(EntityType.MONEY, "$500")}
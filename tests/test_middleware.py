@@ -0,0 +1,40 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.api.middleware import BodySizeLimitMiddleware
+
+
+def _client(limit: int) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware, max_body_bytes=limit, detail="too large")
+    
+    @app.post("/echo")
+    async def echo(request: Request):
+        return {"size": len(await request.body())}
+    
+    return TestClient(app)
+
+
+def test_body_within_limit_passes():
+    response = _client(16).post("/echo", content=b"x" * 16)
+    
+    assert response.status_code == 200
+    assert response.json() == {"size": 16}
+
+
+def test_content_length_over_limit_is_refused():
+    response = _client(16).post("/echo", content=b"x" * 17)
+    
+    assert response.status_code == 413
+    assert response.json() == {"detail": "too large"}
+
+
+def test_streamed_body_over_limit_is_cut_off():
+    # a generator body is sent chunked, without a Content-Length
+    def body():
+        for _ in range(4):
+            yield b"x" * 8
+    
+    response = _client(16).post("/echo", content=body())
+    
+    assert response.status_code == 413
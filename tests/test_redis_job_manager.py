@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")  # the job writes are a lua script
+
+import redis.asyncio as aioredis
+
+from app.processors import JobState, RedisJobManager
+
+
+@pytest.fixture
+def run(monkeypatch):
+    # each test body gets its own fake server and a manager bound to the running loop
+    def _run(body, ttl_seconds=60):
+        async def _main():
+            server = fakeredis.FakeServer()
+            monkeypatch.setattr(
+                aioredis.Redis, "from_url",
+                lambda *args, **kwargs: fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+            )
+            manager = RedisJobManager("redis://test", ttl_seconds=ttl_seconds)
+            try:
+                return await body(manager)
+            finally:
+                await manager.close()
+        return asyncio.run(_main())
+    return _run
+
+
+def test_new_job_is_pending(run):
+    async def body(manager):
+        job_id = await manager.create_job({"filename": "doc.pdf"})
+        job = await manager.get_job(job_id)
+        
+        assert job.status == JobState.PENDING
+        assert job.file_info == {"filename": "doc.pdf"}
+        stats = await manager.get_stats()
+        assert stats["total_jobs"] == 1
+        assert stats["by_status"]["pending"] == 1
+    
+    run(body)
+
+
+def test_status_change_moves_the_counts(run):
+    async def body(manager):
+        job_id = await manager.create_job({"filename": "doc.pdf"})
+        await manager.update_job_status(job_id, JobState.PROCESSING, progress=10, message="extracting")
+        
+        stats = await manager.get_stats()
+        assert stats["by_status"]["pending"] == 0
+        assert stats["by_status"]["processing"] == 1
+        
+        # same status again doesnt count the job twice
+        await manager.update_job_status(job_id, JobState.PROCESSING, progress=50)
+        await manager.update_job_status(job_id, JobState.FAILED, error_message="boom")
+        
+        job = await manager.get_job(job_id)
+        assert job.status == JobState.FAILED
+        assert job.progress == 50
+        assert job.error_message == "boom"
+        stats = await manager.get_stats()
+        assert stats["total_jobs"] == 1
+        assert stats["by_status"]["failed"] == 1
+    
+    run(body)
+
+
+def test_results_survive_a_later_status_update(run):
+    async def body(manager):
+        job_id = await manager.create_job({"filename": "doc.pdf"})
+        await manager.set_job_results(
+            job_id, extracted_text=None, summary="short", entities=[],
+            metadata={"pages_processed": 1}, processing_time=2.0
+        )
+        await manager.update_job_status(job_id, JobState.COMPLETED, progress=100)
+        
+        status = await manager.get_job_status(job_id)
+        assert status["status"] == "completed"
+        assert status["result"]["summary"] == "short"
+        assert status["result"]["metadata"] == {"pages_processed": 1}
+    
+    run(body)
+
+
+def test_update_after_delete_is_dropped(run):
+    async def body(manager):
+        job_id = await manager.create_job({"filename": "doc.pdf"})
+        assert await manager.delete_job(job_id)
+        
+        await manager.update_job_status(job_id, JobState.PROCESSING, progress=10)
+        
+        assert await manager.get_job(job_id) is None
+        assert not await manager.job_exists(job_id)
+        assert (await manager.get_stats())["total_jobs"] == 0
+        assert not await manager.delete_job(job_id)
+    
+    run(body)
+
+
+def test_expired_jobs_leave_the_stats(run):
+    async def body(manager):
+        await manager.create_job({"filename": "doc.pdf"})
+        assert (await manager.get_stats())["total_jobs"] == 1
+        
+        await asyncio.sleep(1.2)
+        
+        assert (await manager.get_stats())["total_jobs"] == 0
+        assert await manager.get_all_jobs() == {}
+    
+    run(body, ttl_seconds=1)
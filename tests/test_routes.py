@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.main import app
+from app.processors import JobState, job_manager
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(routes, "UPLOAD_DIR", tmp_path)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _new_job() -> str:
+    return asyncio.run(job_manager.create_job({"filename": "doc.pdf"}))
+
+
+def _set_status(job_id: str, status: JobState, progress: int):
+    asyncio.run(job_manager.update_job_status(job_id, status, progress=progress, message="step"))
+
+
+# status polling
+
+def test_status_returns_etag_and_304_when_unchanged(client):
+    job_id = _new_job()
+    
+    first = client.get(f"/api/status/{job_id}")
+    assert first.status_code == 200
+    assert first.json()["status"] == "pending"
+    etag = first.headers["ETag"]
+    
+    again = client.get(f"/api/status/{job_id}", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert again.content == b""
+
+
+def test_status_etag_changes_with_the_job(client):
+    job_id = _new_job()
+    etag = client.get(f"/api/status/{job_id}").headers["ETag"]
+    
+    _set_status(job_id, JobState.PROCESSING, 30)
+    response = client.get(f"/api/status/{job_id}", headers={"If-None-Match": etag})
+    
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["progress"] == 30
+
+
+def test_completed_status_includes_the_result(client):
+    job_id = _new_job()
+    asyncio.run(job_manager.set_job_results(
+        job_id, extracted_text=None, summary="short", entities=[], metadata={"pages_processed": 1},
+        processing_time=1.5
+    ))
+    _set_status(job_id, JobState.COMPLETED, 100)
+    
+    body = client.get(f"/api/status/{job_id}").json()
+    
+    assert body["status"] == "completed"
+    assert body["result"]["summary"] == "short"
+    assert body["result"]["processing_time_seconds"] == 1.5
+    # the cached body is served again unchanged
+    assert client.get(f"/api/status/{job_id}").json() == body
+
+
+def test_status_of_unknown_job_is_404(client):
+    assert client.get("/api/status/job_missing").status_code == 404
+
+
+# resumable chunked uploads
+
+def _init_upload(client, size: int) -> str:
+    response = client.post("/api/upload/init", json={"filename": "doc.pdf", "size_bytes": size, "max_pages": 1})
+    assert response.status_code == 200
+    return response.json()["upload_id"]
+
+
+def test_chunks_out_of_order_assemble_the_file(client, tmp_path, pdf_bytes):
+    upload_id = _init_upload(client, len(pdf_bytes))
+    half = len(pdf_bytes) // 2
+    
+    tail = client.patch(f"/api/upload/{upload_id}", params={"offset": half}, content=pdf_bytes[half:])
+    assert tail.status_code == 200
+    # only the contiguous prefix counts as received
+    assert client.get(f"/api/upload/{upload_id}").json()["offset"] == 0
+    
+    head = client.patch(f"/api/upload/{upload_id}", params={"offset": 0}, content=pdf_bytes[:half])
+    assert head.json()["offset"] == half
+    assert client.get(f"/api/upload/{upload_id}").json()["offset"] == len(pdf_bytes)
+    
+    finished = client.post(f"/api/upload/{upload_id}/finish")
+    assert finished.status_code == 200
+    file_info = finished.json()["file_info"]
+    assert file_info["pages"] == 1
+    with open(file_info["file_path"], "rb") as f:
+        assert f.read() == pdf_bytes
+    
+    # the upload state is gone, a second finish cant reuse it
+    assert client.post(f"/api/upload/{upload_id}/finish").status_code == 404
+    assert not list(tmp_path.glob(f"{upload_id}.*"))
+
+
+def test_finish_before_all_chunks_is_refused(client, pdf_bytes):
+    upload_id = _init_upload(client, len(pdf_bytes))
+    client.patch(f"/api/upload/{upload_id}", params={"offset": 0}, content=pdf_bytes[:10])
+    
+    response = client.post(f"/api/upload/{upload_id}/finish")
+    
+    assert response.status_code == 400
+    assert "incomplete" in response.json()["detail"]
+
+
+def test_chunk_past_the_declared_size_is_refused(client):
+    upload_id = _init_upload(client, 100)
+    
+    response = client.patch(f"/api/upload/{upload_id}", params={"offset": 90}, content=b"x" * 20)
+    
+    assert response.status_code == 400
+
+
+def test_init_over_the_size_limit_is_refused(client):
+    response = client.post("/api/upload/init", json={"filename": "doc.pdf", "size_bytes": 2 * 1024 * 1024})
+    
+    assert response.status_code == 413
+
+
+def test_unknown_upload_is_404(client):
+    assert client.get(f"/api/upload/{'0' * 32}").status_code == 404
+    assert client.get("/api/upload/not-an-id").status_code == 404